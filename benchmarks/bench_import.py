@@ -0,0 +1,151 @@
+"""
+Import-time benchmark for rapid_gwm_build.
+
+Every target is imported in a fresh interpreter (as in worker and helper processes), the import
+time is measured and the heavy dependencies loaded by the import are recorded. Results can be
+compared against a stored baseline:
+
+    python benchmarks/bench_import.py --output import.json
+    python benchmarks/bench_import.py --baseline import.json --threshold 0.25
+    python benchmarks/bench_import.py --importtime rapid_gwm_build.factory  # slowest modules
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+TARGETS = {
+    "package": "import rapid_gwm_build",
+    "factory": "import rapid_gwm_build.factory",
+    "config_parser": "import rapid_gwm_build.parsers.config_parser",
+    "simulation": "from rapid_gwm_build.simulation import Simulation",
+}
+HEAVY_MODULES = ["networkx", "numpy", "pandas", "gridit", "cerberus", "flopy", "matplotlib"]
+
+_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _env() -> dict:
+    # the child processes import the same rapid_gwm_build as this process
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+    return env
+
+
+def run_once(statement: str) -> dict:
+    script = _SCRIPT.format(statement=statement, heavy=HEAVY_MODULES)
+    out = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True, env=_env())
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run_target(name: str, statement: str, repeat: int = 5, warmup: int = 1) -> dict:
+    for _ in range(warmup):
+        run_once(statement)  # compiles the .pyc files
+    runs = [run_once(statement) for _ in range(repeat)]
+    elapsed = [r["elapsed"] for r in runs]
+    return {
+        "target": name,
+        "statement": statement,
+        "min": min(elapsed),
+        "median": statistics.median(elapsed),
+        "loaded": runs[-1]["loaded"],
+    }
+
+
+def importtime(module: str, top: int = 15):
+    """
+    Print the modules with the largest cumulative import time (python -X importtime).
+    """
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, env=_env())
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    print(f"{'cumulative':>12}{'self':>10}  module")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>10.1f}ms{self_us / 1000:>8.1f}ms  {name}")
+
+
+def compare(results: list, baseline: dict, threshold: float) -> list:
+    """
+    Compare the min import times and the loaded heavy modules against a baseline. Returns a list of regressions.
+    """
+    base = {r["target"]: r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'target':<16}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for r in results:
+        b = base.get(r["target"])
+        if b is None or b["statement"] != r["statement"]:
+            print(f"{r['target']:<16}(no matching baseline)")
+            continue
+        ratio = r["min"] / b["min"] if b["min"] > 0 else float("inf")
+        flag = " <-- regression" if ratio > 1 + threshold else ""
+        new_modules = sorted(set(r["loaded"]) - set(b["loaded"]))
+        if new_modules:
+            flag += f" <-- now imports {', '.join(new_modules)}"
+        print(f"{r['target']:<16}{b['min']:>12.4f}{r['min']:>12.4f}{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append((r["target"], ratio, new_modules))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", choices=sorted(TARGETS), help="Targets to import (default: all).")
+    parser.add_argument("--repeat", type=int, default=5, help="Imports per target (the min is compared).")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed imports per target (bytecode compilation).")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against the results in this JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before flagging a regression.")
+    parser.add_argument("--importtime", metavar="MODULE", help="Only print the slowest modules imported by MODULE.")
+    args = parser.parse_args(argv)
+
+    if args.importtime:
+        importtime(args.importtime)
+        return 0
+
+    results = []
+    for name in args.target or list(TARGETS):
+        result = run_target(name, TARGETS[name], repeat=args.repeat, warmup=args.warmup)
+        results.append(result)
+        print(f"{name:<16}{result['min'] * 1000:>8.1f}ms (median {result['median'] * 1000:.1f}ms)  loads: {', '.join(result['loaded']) or '-'}")
+
+    output = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s).")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
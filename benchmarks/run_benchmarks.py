@@ -0,0 +1,160 @@
+"""
+End-to-end benchmarks for rapid_gwm_build.
+
+Times the parse, graph construction, build and write phases separately on synthetic models and
+writes the results as JSON. Results can be compared against a stored baseline:
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --baseline results.json --threshold 0.25
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from synthetic import make_synthetic_model  # noqa: E402
+
+SCENARIOS = {
+    "small": dict(nrow=20, ncol=20, nper=2),
+    "grid": dict(nrow=500, ncol=500, nper=2),
+    "layers": dict(nrow=100, ncol=100, nlay=10, nper=2),
+    "periods": dict(nrow=50, ncol=50, nper=200),
+    "core_modules": dict(nrow=50, ncol=50, nper=12, n_modules=5),
+    "pipes": dict(nrow=200, ncol=200, nper=120, nwells=200, pipe_wel=True),
+}
+PHASES = ["parse", "graph", "build", "write"]
+
+
+def run_once(cfg_path, cache_dir) -> dict:
+    from rapid_gwm_build.parsers.config_parser import ConfigParser
+    from rapid_gwm_build.simulation import Simulation
+
+    timings = dict.fromkeys(PHASES, 0.0)
+    n_nodes = 0
+
+    # silence the flopy/debug prints
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        parsed = ConfigParser.parse(cfg_path)
+        timings["parse"] = time.perf_counter() - start
+
+        for sim_name, sim_cfg in parsed.items():
+            ref_dir = Path(sim_cfg['ws']) / 'ref_data'
+            derived_dir = Path(sim_cfg['ws']).parent / 'derived_data'
+            ref_dir.mkdir(parents=True, exist_ok=True)
+            derived_dir.mkdir(parents=True, exist_ok=True)
+
+            start = time.perf_counter()
+            sim = Simulation.from_config(
+                sim_name, sim_cfg, ref_dir=ref_dir, derived_dir=derived_dir, cache_dir=cache_dir)
+            timings["graph"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            sim.build()
+            timings["build"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            sim.write()
+            timings["write"] += time.perf_counter() - start
+            n_nodes += len(sim.nodes)
+
+    timings["nodes"] = n_nodes
+    return timings
+
+
+def run_scenario(name: str, params: dict, work_dir: Path, repeat: int = 3, warmup: int = 1) -> dict:
+    scenario_dir = work_dir / name
+    cfg_path = make_synthetic_model(scenario_dir, **params)
+
+    # pipes write relative to the working directory
+    cwd = os.getcwd()
+    os.chdir(scenario_dir)
+    try:
+        # a fresh node cache for every run so the build is always cold
+        runs = [run_once(cfg_path, scenario_dir / "cache" / str(i)) for i in range(warmup + repeat)][warmup:]
+    finally:
+        os.chdir(cwd)
+
+    result = {"scenario": name, "params": params, "nodes": runs[0]["nodes"], "repeat": repeat}
+    for phase in PHASES:
+        times = [r[phase] for r in runs]
+        result[phase] = {"min": min(times), "mean": sum(times) / len(times)}
+    result["total"] = {"min": sum(result[p]["min"] for p in PHASES)}
+    return result
+
+
+def compare(results: list, baseline: dict, threshold: float) -> list:
+    """
+    Compare the min timings against a baseline. Returns a list of regressions.
+    """
+    base = {r["scenario"]: r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'scenario':<14}{'phase':<8}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for r in results:
+        b = base.get(r["scenario"])
+        if b is None or b["params"] != r["params"]:
+            print(f"{r['scenario']:<14}(no matching baseline)")
+            continue
+        for phase in PHASES + ["total"]:
+            old, new = b[phase]["min"], r[phase]["min"]
+            ratio = new / old if old > 0 else float("inf")
+            flag = " <-- regression" if ratio > 1 + threshold else ""
+            print(f"{r['scenario']:<14}{phase:<8}{old:>12.4f}{new:>12.4f}{ratio:>8.2f}{flag}")
+            if flag:
+                regressions.append((r["scenario"], phase, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenarios to run (default: all).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario (the min is compared).")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per scenario (imports, file system cache).")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against the results in this JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before flagging a regression.")
+    parser.add_argument("--work-dir", help="Directory for the generated models (default: a temporary directory).")
+    args = parser.parse_args(argv)
+
+    names = args.scenario or list(SCENARIOS)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = Path(args.work_dir or tmp_dir).absolute()
+        results = []
+        for name in names:
+            result = run_scenario(name, SCENARIOS[name], work_dir, repeat=args.repeat, warmup=args.warmup)
+            results.append(result)
+            phases = "  ".join(f"{p}={result[p]['min']:.3f}s" for p in PHASES)
+            print(f"{name:<14}{result['nodes']:>6} nodes  {phases}")
+
+    output = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Synthetic mf6 model generator for the benchmarks.
+
+Writes the input arrays/tables and a user config (in the shape ConfigParser.parse expects) for a
+structured model which can be scaled by grid size, number of stress periods, number of modules
+and the amount of data passed through pipelines.
+"""
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+# modules which are always built (the minimum for a valid mf6 simulation)
+CORE_MODULES = ["sim", "tdis", "ims", "gwf", "dis"]
+# optional modules, added in this order when scaling the number of modules
+OPTIONAL_MODULES = ["npf", "ic", "sto", "oc", "rcha", "wel", "ghb"]
+
+
+def _write_array(path, arr, fmt="%.4f"):
+    np.savetxt(path, arr, fmt=fmt)
+    return str(path)
+
+
+def _write_table(path, columns, rows):
+    with open(path, "w") as f:
+        f.write(",".join(columns) + "\n")
+        f.writelines(",".join(f"{v:.4f}" if isinstance(v, float) else str(v) for v in row) + "\n" for row in rows)
+    return str(path)
+
+
+def _pipeline(input_file, cols, col_map=None):
+    # pipe node IDs are built from the processor name, so a processor can only appear once per pipeline
+    return {
+        "pipeline": {
+            "input": input_file,
+            "pipes": [
+                {"processor": "read_data"},
+                {"processor": "to_mf6_txt", "map": {"period": "stress_period", **(col_map or {})}, "cols": cols},
+            ],
+        }
+    }
+
+
+def make_synthetic_model(
+        out_dir,
+        nrow: int = 50,
+        ncol: int = 50,
+        nlay: int = 1,
+        nper: int = 12,
+        n_modules: int = len(CORE_MODULES) + len(OPTIONAL_MODULES),
+        nwells: int = 10,
+        pipe_wel: bool = False,
+        seed: int = 0,
+        name: str = "synthetic"):
+    """
+    Write a synthetic model to out_dir and return the path of its config file.
+    :param nrow, ncol, nlay: Grid size. The mesh is 2D (layer 1), all layers are passed to the dis module.
+    :param nper: Number of stress periods (one file per period for rcha, wel and ghb).
+    :param n_modules: Number of modules (at least the 5 core modules).
+    :param nwells: Number of wells per stress period.
+    :param pipe_wel: Also build the wel stress_period_data through a pipeline (ghb always is).
+    """
+    if n_modules < len(CORE_MODULES):
+        raise ValueError(f"n_modules must be at least {len(CORE_MODULES)} ({', '.join(CORE_MODULES)}).")
+
+    rng = np.random.default_rng(seed)
+    out_dir = Path(out_dir).absolute()
+    input_dir = out_dir / "input"
+    input_dir.mkdir(parents=True, exist_ok=True)
+    ws = out_dir / "models" / name
+
+    # grid arrays
+    top = 100.0 + rng.random((nrow, ncol)) * 10.0
+    layer_thickness = 100.0 / nlay
+    botm = np.stack([top - 110.0 - layer_thickness * (k + 1) for k in range(nlay)])
+    top_file = _write_array(input_dir / "top.arr", top)
+    botm_file = _write_array(input_dir / "botm_layer1.arr", botm[0])
+    idomain_file = _write_array(input_dir / "idomain_layer1.arr", np.ones((nrow, ncol), dtype=int), fmt="%d")
+    botm_all_file = _write_array(input_dir / "botm.txt", botm.reshape(nlay * nrow, ncol))
+    idomain_all_file = _write_array(input_dir / "idomain.txt", np.ones((nlay * nrow, ncol), dtype=int), fmt="%d")
+
+    modules = {
+        "sim": {"sim_name": name, "sim_ws": str(ws)},
+        "tdis": {
+            "time_units": "days",
+            "nper": nper,
+            "perioddata": [[30.0, 1, 1.0] for _ in range(nper)],
+        },
+        "ims": {"complexity": "SIMPLE"},
+        "gwf": {"modelname": name},
+        "dis": {"length_units": "meters", "nlay": nlay, "botm": {"filename": botm_all_file},
+                "idomain": {"filename": idomain_all_file}},
+    }
+
+    for module in OPTIONAL_MODULES[:n_modules - len(CORE_MODULES)]:
+        if module == "npf":
+            k_file = _write_array(input_dir / "k.txt", rng.lognormal(0.0, 1.0, (nlay * nrow, ncol)))
+            modules["npf"] = {"icelltype": 1, "k": {"filename": k_file}, "save_flows": True}
+        elif module == "ic":
+            strt_file = _write_array(input_dir / "strt.txt", np.tile(top, (nlay, 1)))
+            modules["ic"] = {"strt": {"filename": strt_file}}
+        elif module == "sto":
+            modules["sto"] = {"iconvert": 1, "ss": 1e-5, "sy": 0.1, "transient": {0: True}}
+        elif module == "oc":
+            modules["oc"] = {
+                "budget_filerecord": f"{name}.cbc",
+                "head_filerecord": f"{name}.hds",
+                "saverecord": {0: [["BUDGET", "LAST"], ["HEAD", "LAST"]]},
+            }
+        elif module == "rcha":
+            recharge = {}
+            for kper in range(nper):
+                fname = _write_array(input_dir / f"rch_{kper + 1}.txt", rng.random((nrow, ncol)) * 1e-3)
+                recharge[kper] = {"filename": fname}
+            modules["rcha"] = {"recharge": recharge}
+        elif module == "wel":
+            cells = [
+                (kper, rng.integers(1, nlay + 1), rng.integers(1, nrow + 1), rng.integers(1, ncol + 1), -rng.random() * 100.0)
+                for kper in range(1, nper + 1) for _ in range(nwells)
+            ]
+            if pipe_wel:
+                wel_file = _write_table(input_dir / "wel.csv", ["period", "k", "i", "j", "q"], cells)
+                modules["wel"] = {
+                    "maxbound": nwells,
+                    "src": {"stress_period_data": _pipeline(wel_file, ["k", "i", "j", "q"])},
+                }
+            else:
+                spd = {}
+                for kper in range(1, nper + 1):
+                    fname = input_dir / f"wel_{kper}.txt"
+                    np.savetxt(fname, [c[1:] for c in cells if c[0] == kper], fmt=["%d", "%d", "%d", "%.4f"])
+                    spd[kper - 1] = {"filename": str(fname)}
+                modules["wel"] = {"maxbound": nwells, "stress_period_data": spd}
+        elif module == "ghb":
+            # boundary along the first column for every stress period
+            rows = [(kper, 1, i, 1, 95.0 + kper * 0.01, 10.0) for kper in range(1, nper + 1) for i in range(1, nrow + 1)]
+            ghb_file = _write_table(input_dir / "ghb.csv", ["period", "k", "i", "j", "head", "cond"], rows)
+            modules["ghb"] = {
+                "maxbound": nrow,
+                "src": {"stress_period_data": _pipeline(ghb_file, ["k", "i", "j", "bhead", "cond"], {"head": "bhead"})},
+            }
+
+    config = {
+        "simulations": {
+            name: {
+                "sim_type": "mf6",
+                "ws": str(ws),
+                "mesh": {
+                    "kind": "structured",
+                    "nlay": 1,
+                    "nrow": nrow,
+                    "ncol": ncol,
+                    "resolution": 10,
+                    "top": top_file,
+                    "bottoms": botm_file,
+                    "active_domain": idomain_file,
+                },
+                "modules": modules,
+            }
+        }
+    }
+
+    cfg_path = out_dir / f"{name}.yaml"
+    with open(cfg_path, "w") as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+    return cfg_path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a synthetic model config.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--nrow", type=int, default=50)
+    parser.add_argument("--ncol", type=int, default=50)
+    parser.add_argument("--nlay", type=int, default=1)
+    parser.add_argument("--nper", type=int, default=12)
+    parser.add_argument("--n-modules", type=int, default=len(CORE_MODULES) + len(OPTIONAL_MODULES))
+    parser.add_argument("--nwells", type=int, default=10)
+    parser.add_argument("--pipe-wel", action="store_true")
+    args = parser.parse_args()
+
+    print(make_synthetic_model(
+        args.out_dir, nrow=args.nrow, ncol=args.ncol, nlay=args.nlay, nper=args.nper,
+        n_modules=args.n_modules, nwells=args.nwells, pipe_wel=args.pipe_wel))
@@ -1,5 +1,23 @@
-from .factory import (
-    create_simulation,
-)  # Import create_simulation from the factory module
+__all__ = ["create_simulation", "create_simulations"]  # Add create_simulation to the public API
 
-__all__ = ["create_simulation"]  # Add create_simulation to the public API
+# the public API is imported on first use (PEP 562), so importing the package (ie. in worker or
+# helper processes) does not load networkx, numpy or pandas
+_lazy_attrs = {
+    "create_simulation": "rapid_gwm_build.factory",
+    "create_simulations": "rapid_gwm_build.factory",
+}
+
+
+def __getattr__(name):
+    module_name = _lazy_attrs.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,239 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "rapid_gwm_build"
+DEFAULT_MAX_SIZE = 2 * 1024**3  # 2 GB
+
+
+def default_cache_dir() -> Path:
+    """
+    Returns the root cache directory. Can be overridden with the RAPID_GWM_BUILD_CACHE environment variable.
+    """
+    return Path(os.environ.get("RAPID_GWM_BUILD_CACHE", DEFAULT_CACHE_DIR))
+
+
+def stable_repr(obj):
+    """
+    Returns a deterministic representation of a (nested) config value so it can be hashed.
+    Dict keys are sorted by their repr so mixed key types (ie. {0: .., 'a': ..}) are allowed.
+    """
+    if isinstance(obj, dict):
+        return "{" + ",".join(f"{k!r}:{stable_repr(v)}" for k, v in sorted(obj.items(), key=lambda kv: repr(kv[0]))) + "}"
+    elif isinstance(obj, (list, tuple)):
+        return "[" + ",".join(stable_repr(v) for v in obj) + "]"
+    elif hasattr(obj, "tobytes") and hasattr(obj, "dtype"):
+        # numpy arrays: hash the contents rather than the (truncated) repr
+        return f"array({obj.dtype},{getattr(obj, 'shape', None)},{hashlib.sha256(obj.tobytes()).hexdigest()})"
+    return repr(obj)
+
+
+def hash_file(filepath, chunk_size=1024**2) -> str:
+    """
+    Returns the sha256 digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class NodeCache:
+    """
+    Content-addressed on-disk cache for resolved node data.
+
+    Entries are keyed on a fingerprint of the node (type, src, node kwargs, input file
+    contents) and the fingerprints of its upstream nodes. The cache is capped at `max_size`
+    bytes and the least recently used entries are evicted first.
+    """
+    def __init__(self, cache_dir=None, max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir() / "nodes"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+
+        self._index_path = self.cache_dir / "index.json"
+        self._entries, self._files = self._load_index()
+        self._dirty_index = False
+        self._lock = threading.RLock()  # the cache can be shared by build worker threads
+
+    def _load_index(self):
+        if self._index_path.exists():
+            try:
+                with open(self._index_path, "r") as f:
+                    index = json.load(f)
+                return index.get("entries", {}), index.get("files", {})
+            except (OSError, ValueError) as e:
+                logging.warning(f"Could not read cache index {self._index_path}: {e}. Starting with an empty cache.")
+        return {}, {}
+
+    def flush(self):
+        """
+        Write the cache index to disk (only if it has changed).
+        """
+        with self._lock:
+            if not self._dirty_index:
+                return
+            # keep the entries written by other processes sharing the cache directory
+            disk_entries, disk_files = self._load_index()
+            for key, entry in disk_entries.items():
+                if key not in self._entries and self._entry_path(key).exists():
+                    self._entries[key] = entry
+            for path, known in disk_files.items():
+                self._files.setdefault(path, known)
+
+            tmp_path = self._index_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"entries": self._entries, "files": self._files}, f)
+            os.replace(tmp_path, self._index_path)
+            self._dirty_index = False
+
+    def file_digest(self, filepath) -> str:
+        """
+        Returns the content hash of an input file. Hashes are memoized on (size, mtime) so
+        unchanged files are not re-read on every build.
+        """
+        path = os.path.abspath(filepath)
+        stat = os.stat(path)
+        known = self._files.get(path)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+
+        digest = hash_file(path)
+        with self._lock:
+            self._files[path] = [stat.st_size, stat.st_mtime_ns, digest]
+            self._dirty_index = True
+        return digest
+
+    def fingerprint(self, node, upstream: list = None, **context) -> str:
+        """
+        Returns the fingerprint of a node given the fingerprints of its upstream nodes.
+        """
+        items = node.cache_key_items(file_digest=self.file_digest, **context)
+        items["upstream"] = list(upstream or [])
+        return hashlib.sha256(stable_repr(items).encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pkl"
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries and self._entry_path(key).exists()
+
+    def get(self, key: str):
+        """
+        Returns (hit, data) for the given fingerprint.
+        """
+        with self._lock:
+            if key not in self:
+                self.misses += 1
+                return False, None
+
+        try:
+            with open(self._entry_path(key), "rb") as f:
+                data = pickle.load(f)
+        except Exception as e:
+            logging.warning(f"Could not load cache entry {key}: {e}. Treating as a miss.")
+            with self._lock:
+                self._remove(key)
+                self.misses += 1
+            return False, None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries[key]["atime"] = time.time()
+                self._dirty_index = True
+            self.hits += 1
+        return True, data
+
+    def put(self, key: str, data, node_id: str = None, elapsed: float = None):
+        """
+        Store the data for the given fingerprint. Data which cannot be pickled is skipped.
+        """
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(path, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logging.debug(f"Node {node_id} data could not be cached: {e}")
+            path.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self._entries[key] = {
+                "node_id": node_id,
+                "size": path.stat().st_size,
+                "atime": time.time(),
+                "elapsed": elapsed,
+            }
+            self._dirty_index = True
+            self._evict()
+
+    def _remove(self, key: str):
+        self._entries.pop(key, None)
+        self._entry_path(key).unlink(missing_ok=True)
+        self._dirty_index = True
+
+    def _evict(self):
+        """
+        Remove the least recently used entries until the cache is under max_size.
+        """
+        total = self.size
+        if total <= self.max_size:
+            return
+        for key, entry in sorted(self._entries.items(), key=lambda kv: kv[1]["atime"]):
+            self._remove(key)
+            total -= entry["size"]
+            logging.debug(f"Evicted cache entry for {entry['node_id']} ({entry['size']} bytes).")
+            if total <= self.max_size:
+                break
+
+    def clear(self):
+        """
+        Remove all entries from the cache.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+            self.hits = 0
+            self.misses = 0
+            self.flush()
+
+    def timings(self) -> dict:
+        """
+        Resolve time (seconds) of the most recently used entry of each node ID.
+        """
+        timings, atimes = {}, {}
+        with self._lock:
+            for entry in self._entries.values():
+                node_id, elapsed = entry.get("node_id"), entry.get("elapsed")
+                if elapsed is None or entry["atime"] < atimes.get(node_id, 0.0):
+                    continue
+                timings[node_id] = elapsed
+                atimes[node_id] = entry["atime"]
+        return timings
+
+    @property
+    def size(self) -> int:
+        return sum(entry["size"] for entry in self._entries.values())
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "size": self.size,
+            "max_size": self.max_size,
+        }
+
+    def __repr__(self):
+        return f"NodeCache({self.cache_dir}, {len(self._entries)} entries, {self.hits} hits, {self.misses} misses)"
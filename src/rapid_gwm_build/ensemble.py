@@ -0,0 +1,254 @@
+import hashlib
+import logging
+import math
+import os
+import shutil
+import time
+from copy import deepcopy
+from pathlib import Path
+
+import networkx as nx
+
+from rapid_gwm_build.cache import stable_repr
+from rapid_gwm_build.factory import _new_simulation
+from rapid_gwm_build.io.object_store import ObjectStore
+from rapid_gwm_build.parsers.config_parser import ConfigParser
+
+
+def set_config_value(config: dict, path: str, value):
+    """
+    Set a value in a nested config from a dotted path (ie. 'modules.npf.k' or 'modules.rcha.recharge.0').
+    Missing dictionaries are created. Integer keys and list indices are allowed.
+    """
+    keys = path.split(".")
+    obj = config
+    for i, key in enumerate(keys):
+        if isinstance(obj, list):
+            key = int(key)
+        elif key not in obj and key.lstrip("-").isdigit() and int(key) in obj:
+            key = int(key)
+
+        if i == len(keys) - 1:
+            obj[key] = value
+        elif isinstance(obj, list):
+            obj = obj[key]
+        else:
+            obj = obj.setdefault(key, {})
+
+
+def _is_missing(value) -> bool:
+    # empty cells of an overrides table
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _to_python(value):
+    # numpy scalars (ie. from a DataFrame) -> python values
+    if hasattr(value, "item") and getattr(value, "ndim", None) == 0:
+        return value.item()
+    return value
+
+
+def _copy_files(src_dir: Path, dst_dir: Path, files: list):
+    # copy files (relative paths) which do not exist in dst_dir yet
+    for relpath in files:
+        dst = dst_dir / relpath
+        if not dst.exists():
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(src_dir / relpath, dst)
+
+
+def config_keys(sim, ws=None) -> dict:
+    """
+    Hash of the config of every node in the build graph and of its upstream nodes (ie. a fingerprint
+    which does not read input files). Module nodes only contribute their ID to downstream keys, and
+    the workspace path is normalized so realizations in other workspaces can be compared.
+    """
+    graph = sim.graph.subgraph
+    keys = {}
+    for n_id in nx.topological_sort(graph):
+        items = sim.nodes[n_id].cache_key_items()
+        items["upstream"] = [
+            p if sim.nodes[p].type == "module" else keys[p] for p in sorted(graph.predecessors(n_id))
+        ]
+        key = stable_repr(items)
+        if ws is not None:
+            key = key.replace(str(ws), "<ws>")
+        keys[n_id] = hashlib.sha256(key.encode()).hexdigest()
+    return keys
+
+
+class Ensemble:
+    """
+    Builds realizations of a base simulation which differ in a few config values (ie. Monte Carlo or
+    PEST++ ensembles).
+
+    Each realization is diffed against the base simulation: nodes whose config (and upstream config)
+    is unchanged share the resolved data of the base nodes, the input files written for the base are
+    copied and only the modules which changed are rebuilt and rewritten.
+    """
+    def __init__(
+            self,
+            cfg_filepath: os.PathLike,
+            sim_name: str = None,
+            ensemble_dir: os.PathLike = None,
+            dedup: bool = False,
+            **sim_kwargs):
+        """
+        :param cfg_filepath: Config file of the base simulation.
+        :param sim_name: Simulation in the config file (default: the first one).
+        :param ensemble_dir: Directory for the realization workspaces (default: next to the base workspace).
+        :param dedup: Hard link identical workspace files to an ObjectStore in ensemble_dir/objects
+            instead of copying them.
+        :param sim_kwargs: Passed to `Simulation` (ie. cache_dir, memory_budget).
+        """
+        self.config = ConfigParser.load_yaml(cfg_filepath)
+        simulations = self.config.get("simulations", {})
+        self.sim_name = sim_name or next(iter(simulations))
+        if self.sim_name not in simulations:
+            raise KeyError(f"Simulation {self.sim_name} not found in {cfg_filepath}.")
+        self.sim_kwargs = sim_kwargs
+
+        parsed = ConfigParser.parse_config(deepcopy(self.config), sim_names=[self.sim_name])[self.sim_name]
+        self.base = _new_simulation(self.sim_name, parsed, **sim_kwargs)
+        self.base_ws = Path(parsed["ws"])
+        self.ensemble_dir = Path(ensemble_dir) if ensemble_dir else self.base_ws.parent / f"{self.sim_name}_ensemble"
+        self.store = ObjectStore(self.ensemble_dir / "objects") if dedup else None
+
+        self.results = {}  # realization name -> summary of its build
+        self._base_keys = None
+        self._base_written = False
+
+    def build_base(self, write: bool = True):
+        """
+        Build (and write) the base simulation. Called by the first realization if needed.
+        """
+        self.base.build()
+        if write:
+            self.base.write(dedup=self.store)
+            self._base_written = True
+        self._base_keys = config_keys(self.base)
+        self._base_module_keys = config_keys(self.base, self.base_ws)
+
+    def realization_config(self, name: str, overrides: dict) -> dict:
+        """
+        Copy of the user config with the overrides applied and the workspace moved to the ensemble directory.
+        :param overrides: Dotted paths relative to the simulation config (ie. {'modules.npf.k': 5.0}),
+            or to the top of the config for variables (ie. {'vars.input_dir': ...}).
+        """
+        config = deepcopy(self.config)
+        sim_cfg = config["simulations"][self.sim_name]
+        sim_cfg["ws"] = str(self.realization_ws(name))
+
+        for path, value in overrides.items():
+            if _is_missing(value):
+                continue
+            target = config if path.startswith("vars.") else sim_cfg
+            set_config_value(target, path, _to_python(value))
+        return config
+
+    def realization_ws(self, name: str) -> Path:
+        return self.ensemble_dir / str(name) / self.base_ws.name
+
+    def realization(self, name: str, overrides: dict) -> tuple:
+        """
+        Create a realization which shares the resolved data of its unchanged nodes with the base simulation.
+        :return: (Simulation, list of changed non-module node IDs, list of changed module node IDs)
+        """
+        if self._base_keys is None:
+            self.build_base()
+
+        config = self.realization_config(name, overrides)
+        parsed = ConfigParser.parse_config(config, sim_names=[self.sim_name])[self.sim_name]
+        sim = _new_simulation(str(name), parsed, **self.sim_kwargs)
+
+        # data is only shared if the config is identical, while modules are only rewritten if they
+        # differ by more than the workspace
+        keys = config_keys(sim)
+        module_keys = config_keys(sim, self.realization_ws(name))
+        graph = sim.graph.subgraph
+        changed, modules = [], []
+        for n_id, key in keys.items():
+            node = sim.nodes[n_id]
+            unchanged = self._base_keys.get(n_id) == key
+            if node.type == "module":
+                if self._base_module_keys.get(n_id) != module_keys[n_id]:
+                    modules.append(n_id)
+                continue
+            elif node.type == "placeholder":
+                continue
+
+            base_node = self.base.nodes.get(n_id)
+            reads_module = any(sim.nodes[p].type == "module" for p in graph.predecessors(n_id))
+            if unchanged and not reads_module and base_node is not None and base_node._data is not None:
+                # share the base data, downstream nodes do not modify their inputs
+                node._data = base_node._data
+                if hasattr(base_node, "_source_stat"):
+                    node._source_stat = base_node._source_stat
+                node.mark_clean()
+            else:
+                changed.append(n_id)
+        return sim, changed, modules
+
+    def build_realization(self, name: str, overrides: dict, write: bool = True) -> dict:
+        """
+        Build (and write) a single realization.
+        :return: Summary of the realization (workspace, changed nodes and modules, elapsed seconds).
+        """
+        start = time.perf_counter()
+        ws = self.realization_ws(name)
+        if ws.exists():
+            shutil.rmtree(ws)  # no stale files from a previous run
+        sim, changed, modules = self.realization(name, overrides)
+
+        # modules which other modules hang off (ie. the simulation or model) change every file
+        graph = sim.graph.subgraph
+        full = any(sim.nodes[succ].type == "module" for m in modules for succ in graph.successors(m))
+
+        if write and self._base_written and not full:
+            # write the changed modules, then take the input files of the other modules from the base
+            # workspace (not the outputs of base runs)
+            if modules:
+                requires = sim.template.get('write_module', {}).get('requires', [])
+                sim.build(mode="dirty", targets=modules + [m for m in requires if m in sim.nodes])
+                sim.write(packages=modules, dedup=self.store)
+            if self.store is not None:
+                self.store.link_tree(self.base_ws, ws, files=self.base.written_files)
+            else:
+                _copy_files(self.base_ws, ws, self.base.written_files)
+        else:
+            sim.build(mode="dirty")
+            if write:
+                sim.write(dedup=self.store)
+
+        summary = {
+            "ws": str(ws),
+            "changed": changed,
+            "modules": modules,
+            "full": full,
+            "elapsed": time.perf_counter() - start,
+        }
+        self.results[name] = summary
+        logging.debug(f"Realization {name}: {len(changed)} changed nodes, {len(modules)} modules rebuilt in {summary['elapsed']:.2f}s.")
+        return summary
+
+    def run(self, overrides, write: bool = True) -> dict:
+        """
+        Build (and write) every realization.
+        :param overrides: Per-realization overrides as a {name: {dotted path: value}} dict, a list of
+            dicts (named r0, r1, ...) or a pandas DataFrame (index: names, columns: dotted paths).
+        :return: Dictionary of realization name -> summary.
+        """
+        if hasattr(overrides, "to_dict") and hasattr(overrides, "index"):
+            overrides = overrides.to_dict(orient="index")
+        elif isinstance(overrides, list):
+            width = len(str(max(len(overrides) - 1, 0)))
+            overrides = {f"r{i:0{width}d}": o for i, o in enumerate(overrides)}
+
+        if self._base_keys is None:
+            self.build_base(write=write)
+        for name, realization_overrides in overrides.items():
+            self.build_realization(name, realization_overrides, write=write)
+        return {name: self.results[name] for name in overrides}
+
+    def __repr__(self):
+        return f"Ensemble({self.sim_name}, {len(self.results)} realizations)"
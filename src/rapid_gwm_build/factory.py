@@ -1,21 +1,164 @@
+import logging
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from rapid_gwm_build.cache import stable_repr
+from rapid_gwm_build.io.input_types import FilepathInput
 from rapid_gwm_build.parsers.config_parser import ConfigParser
 from rapid_gwm_build.simulation import Simulation
+from rapid_gwm_build.trace import BuildTrace
+from rapid_gwm_build.utils import prewarm_template
 
 
-def create_simulation(cfg_filepath: os.PathLike):
+def _new_simulation(sim_name: str, sim_cfg: dict, **sim_kwargs) -> Simulation:
+    # set working directory
+    ref_dir = Path(sim_cfg['ws']) / 'ref_data'
+    derived_dir = Path(sim_cfg['ws']).parent /'derived_data'
+
+    # create the dir
+    ref_dir.mkdir(parents=True, exist_ok=True)
+    derived_dir.mkdir(parents=True, exist_ok=True)
+
+    return Simulation.from_config(sim_name, sim_cfg, ref_dir=ref_dir, derived_dir=derived_dir, **sim_kwargs)
+
+
+def create_simulation(cfg_filepath: os.PathLike, **sim_kwargs):
+    """
+    Create the simulation in the config file (the last one if there are several, see `create_simulations`).
+    """
     parsed = ConfigParser.parse(cfg_filepath)
     for sim_name, sim_cfg in parsed.items():
-        # set working directory
-        ref_dir = Path(sim_cfg['ws']) / 'ref_data'
-        derived_dir = Path(sim_cfg['ws']).parent /'derived_data'
-        
-        # create the dir
-        ref_dir.mkdir(parents=True, exist_ok=True)
-        derived_dir.mkdir(parents=True, exist_ok=True)
-
-        sim = Simulation.from_config(sim_name, sim_cfg, ref_dir=ref_dir, derived_dir=derived_dir) #TODO: for each sim_cfg
+        sim = _new_simulation(sim_name, sim_cfg, **sim_kwargs)
+        sim.cfg_filepath = cfg_filepath
 
     return sim
+
+
+def create_simulations(
+        cfg_filepath: os.PathLike,
+        build: bool = False,
+        write: bool = False,
+        max_workers: int = None,
+        share_inputs: bool = True,
+        **sim_kwargs) -> dict:
+    """
+    Create all simulations in the config file and optionally build and write them.
+    Per-simulation timings (seconds) are stored in `sim.timings`.
+
+    :param build: Build the simulations.
+    :param write: Build and write the simulations.
+    :param max_workers: Build and write the simulations in this many worker processes. The simulation
+        files are written by the workers: the returned simulations are not built in this process (but
+        `sim.timings` and `sim.trace` hold the timings of the workers).
+    :param share_inputs: Read input files which are used by several simulations (ie. the same mesh
+        files) once. With worker processes the shared inputs are passed through the node cache, so
+        a `cache_dir` is required.
+    :param sim_kwargs: Passed to `Simulation` (ie. cache_dir, memory_budget).
+    :return: Dictionary of simulation name -> Simulation.
+    """
+    parsed = ConfigParser.parse(cfg_filepath)
+
+    sims = {}
+    for sim_name, sim_cfg in parsed.items():
+        start = time.perf_counter()
+        sims[sim_name] = _new_simulation(sim_name, sim_cfg, **sim_kwargs)
+        sims[sim_name].cfg_filepath = cfg_filepath
+        sims[sim_name].timings['create'] = time.perf_counter() - start
+
+    if not (build or write):
+        return sims
+
+    if share_inputs and len(sims) > 1:
+        if max_workers is not None and max_workers > 1 and sim_kwargs.get('cache_dir') is None:
+            logging.warning("Inputs are only shared between worker processes through the node cache. Set cache_dir to share inputs.")
+        else:
+            _share_inputs(sims)
+
+    if max_workers is not None and max_workers > 1:
+        # import and inspect the module functions once, forked workers inherit the cache
+        for sim in {sim.sim_type: sim for sim in sims.values()}.values():
+            prewarm_template(sim.template)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                sim_name: executor.submit(_run_simulation, cfg_filepath, sim_name, write, sim_kwargs)
+                for sim_name in sims
+            }
+            for sim_name, future in futures.items():
+                try:
+                    result = future.result()
+                except Exception as e:
+                    raise RuntimeError(f"Simulation {sim_name} failed in a worker process: {e}") from e
+                sims[sim_name].timings.update(result['timings'])
+                sims[sim_name].trace = BuildTrace.from_report(result['trace'])
+    else:
+        for sim in sims.values():
+            _build_and_write(sim, write)
+
+    for sim_name, sim in sims.items():
+        logging.info(f"Simulation {sim_name}: " + ", ".join(f"{k} {v:.2f}s" for k, v in sim.timings.items()))
+    return sims
+
+
+def _build_and_write(sim: Simulation, write: bool):
+    # inputs shared with other simulations are already resolved (clean)
+    start = time.perf_counter()
+    sim.build(mode="dirty")
+    sim.timings['build'] = time.perf_counter() - start
+
+    if write:
+        start = time.perf_counter()
+        sim.write()
+        sim.timings['write'] = time.perf_counter() - start
+
+
+def _run_simulation(cfg_filepath, sim_name: str, write: bool, sim_kwargs: dict) -> dict:
+    """
+    Worker process: create, build and write a single simulation of the config file.
+    """
+    parsed = ConfigParser.parse(cfg_filepath)
+    start = time.perf_counter()
+    sim = _new_simulation(sim_name, parsed[sim_name], **sim_kwargs)
+    sim.timings['create'] = time.perf_counter() - start
+
+    _build_and_write(sim, write)
+    return {'timings': sim.timings, 'trace': sim.trace.report()}
+
+
+def _share_key(node):
+    if node.type != 'input' or not isinstance(node.input, FilepathInput):
+        return None
+    return os.path.abspath(node.input.filepath), stable_repr(node.input.open_kwargs)
+
+
+def _share_inputs(sims: dict):
+    """
+    Resolve the input files which are used by more than one simulation once and hand the
+    (read-only) data to every simulation using them.
+    """
+    groups = {}
+    for sim in sims.values():
+        for node_id in sim.graph.subgraph:
+            key = _share_key(sim.nodes[node_id])
+            if key is not None:
+                groups.setdefault(key, []).append((sim, node_id))
+
+    for key, users in groups.items():
+        if len({id(sim) for sim, _ in users}) < 2:
+            continue
+
+        sim, node_id = users[0]
+        node = sim.nodes[node_id]
+        sim._resolve_node(node, {})  # also stores the data in the node cache (if any)
+        node.mark_clean()
+        for other_sim, other_id in users[1:]:
+            other = other_sim.nodes[other_id]
+            other._data = node._data
+            other._source_stat = node._source_stat
+            other.mark_clean()
+        logging.debug(f"Input {key[0]} shared by {len(users)} nodes.")
+
+    for sim in sims.values():
+        if sim.cache is not None:
+            sim.cache.flush()
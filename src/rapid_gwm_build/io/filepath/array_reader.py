@@ -0,0 +1,127 @@
+import hashlib
+import json
+import logging
+import os
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+from rapid_gwm_build.cache import default_cache_dir, hash_file, stable_repr
+
+SIDECAR_VERSION = 2  # bump when the parsed arrays change (invalidates the sidecars)
+MIN_SIDECAR_SIZE = 1024**2  # smaller text files are parsed every time
+
+
+def parse_array(filepath, **loadtxt_kwargs) -> np.ndarray:
+    """
+    Parse a whitespace-delimited numeric text array (ie. MF6 .arr files).
+
+    The whole file is converted in a single pass (no per-line parsing) and reshaped to rows x
+    columns. As with np.loadtxt, a single row or column gives a 1D array and '#' comments are skipped.
+    :param loadtxt_kwargs: Parse with np.loadtxt and these arguments instead (ie. usecols, delimiter).
+    :raises ValueError: If the rows do not all have the same number of values, or a value is not a number.
+    """
+    if loadtxt_kwargs:
+        return np.loadtxt(filepath, **loadtxt_kwargs)
+
+    with open(filepath, "rb") as f:
+        text = f.read()
+    if b"#" in text:
+        text = b"\n".join(line.split(b"#", 1)[0] for line in text.splitlines())
+    widths = [len(line.split()) for line in text.splitlines()]
+    widths = [w for w in widths if w]
+    if not widths:
+        return np.empty(0)
+    if min(widths) != max(widths):
+        raise ValueError(f"Could not parse the array in {filepath}: rows have {min(widths)} to {max(widths)} values.")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)  # raised by numpy on values which are not numbers
+        try:
+            values = np.fromstring(text, dtype=float, sep=" ")
+        except (ValueError, DeprecationWarning) as e:
+            raise ValueError(f"Could not parse the array in {filepath}: {e}") from e
+    if values.size != len(widths) * widths[0]:
+        raise ValueError(f"Could not parse the array in {filepath}: some values are not numbers.")
+    return np.squeeze(values.reshape(len(widths), widths[0]))
+
+
+class ArrayReader:
+    """
+    Reads text arrays, keeping a binary .npy sidecar of every large array so later opens are
+    read-only memory maps instead of text parsing.
+
+    Sidecars are stored in <cache dir>/arrays (the input directories may be read-only or under
+    version control) and validated on the source size and mtime, then on its hash when only the
+    mtime changed (ie. a copied or touched file).
+    """
+    sidecar = True
+    min_sidecar_size = MIN_SIDECAR_SIZE
+    sidecar_dir = None  # default: <cache dir>/arrays
+
+    @classmethod
+    def read(cls, filepath, opener_kwargs: dict = None) -> np.ndarray:
+        opener_kwargs = opener_kwargs or {}
+        stat = os.stat(filepath)
+        if not cls.sidecar or stat.st_size < cls.min_sidecar_size:
+            return parse_array(filepath, **opener_kwargs)
+
+        npy_path, meta_path = cls._sidecar_paths(filepath, opener_kwargs)
+        meta = cls._read_meta(meta_path)
+        if meta is not None and meta["size"] == stat.st_size and npy_path.exists():
+            if meta["mtime"] == stat.st_mtime_ns:
+                return np.load(npy_path, mmap_mode="r")
+            if meta["sha256"] == hash_file(filepath):
+                meta["mtime"] = stat.st_mtime_ns
+                cls._write_meta(meta_path, meta)
+                return np.load(npy_path, mmap_mode="r")
+
+        data = parse_array(filepath, **opener_kwargs)
+        try:
+            cls._write_sidecar(npy_path, meta_path, data, {
+                "version": SIDECAR_VERSION,
+                "source": os.path.abspath(filepath),
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+                "sha256": hash_file(filepath),
+            })
+        except OSError as e:
+            logging.debug(f"Array sidecar of {filepath} could not be written: {e}")
+            return data
+        logging.debug(f"Array sidecar of {filepath} written to {npy_path}.")
+        return np.load(npy_path, mmap_mode="r")
+
+    @classmethod
+    def _sidecar_paths(cls, filepath, opener_kwargs: dict):
+        key = hashlib.sha256(
+            f"{os.path.abspath(filepath)}:{stable_repr(opener_kwargs)}:{SIDECAR_VERSION}".encode()
+        ).hexdigest()
+        sidecar_dir = Path(cls.sidecar_dir) if cls.sidecar_dir else default_cache_dir() / "arrays"
+        return sidecar_dir / key[:2] / f"{key}.npy", sidecar_dir / key[:2] / f"{key}.json"
+
+    @staticmethod
+    def _read_meta(meta_path: Path):
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("version") == SIDECAR_VERSION else None
+
+    @staticmethod
+    def _write_meta(meta_path: Path, meta: dict):
+        tmp_path = meta_path.with_name(f".{meta_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    @classmethod
+    def _write_sidecar(cls, npy_path: Path, meta_path: Path, data: np.ndarray, meta: dict):
+        npy_path.parent.mkdir(parents=True, exist_ok=True)
+        # the metadata is written last: a sidecar without (matching) metadata is never used
+        meta_path.unlink(missing_ok=True)
+        tmp_path = npy_path.with_name(f".{npy_path.stem}.{os.getpid()}.tmp.npy")
+        np.save(tmp_path, data)
+        os.replace(tmp_path, npy_path)
+        cls._write_meta(meta_path, meta)
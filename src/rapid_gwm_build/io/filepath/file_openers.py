@@ -19,8 +19,10 @@ class YamlOpener(FileOpener):
 
 @dataclass
 class RasterOpener(FileOpener):
-    def open(self, opener_kwargs={}):
-        pass
+    def open(filepath, opener_kwargs={}):
+        # metadata only, the mesh reads the window covering the grid
+        from rapid_gwm_build.io.filepath.raster import RasterHandle
+        return RasterHandle(filepath, **opener_kwargs)
 
 @dataclass
 class ShapefileOpener(FileOpener):
@@ -29,8 +31,10 @@ class ShapefileOpener(FileOpener):
 
 @dataclass
 class NetCDFOpener(FileOpener):
-    def open(self, opener_kwargs={}):
-        pass
+    def open(filepath, opener_kwargs={}):
+        # metadata only, pipes read one time step of the model window at a time
+        from rapid_gwm_build.io.filepath.netcdf import NetCDFHandle
+        return NetCDFHandle(filepath, **opener_kwargs)
 
 @dataclass
 class CSVOpener(FileOpener):
@@ -41,5 +45,6 @@ class CSVOpener(FileOpener):
 @dataclass
 class ArrayOpener(FileOpener):
     def open(filepath, opener_kwargs={}):
-        import numpy as np
-        return np.loadtxt(filepath, **opener_kwargs)
\ No newline at end of file
+        # large arrays are memory-mapped from a .npy sidecar after the first read
+        from rapid_gwm_build.io.filepath.array_reader import ArrayReader
+        return ArrayReader.read(filepath, opener_kwargs)
\ No newline at end of file
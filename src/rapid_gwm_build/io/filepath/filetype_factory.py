@@ -37,8 +37,13 @@ filetype_factory = FileTypeFactory()
 # Register valid types of inputs in the yaml file
 filetype_factory.register("yaml", YamlOpener)
 filetype_factory.register("tif", RasterOpener)
+filetype_factory.register("tiff", RasterOpener)
 filetype_factory.register("asc", RasterOpener)
+filetype_factory.register("vrt", RasterOpener)
 filetype_factory.register("shp", ShapefileOpener)
 filetype_factory.register("cdf", NetCDFOpener)
+filetype_factory.register("nc", NetCDFOpener)
+filetype_factory.register("nc4", NetCDFOpener)
 filetype_factory.register("csv", CSVOpener)
 filetype_factory.register("arr", ArrayOpener)
+filetype_factory.register("txt", ArrayOpener)
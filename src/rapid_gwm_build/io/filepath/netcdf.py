@@ -0,0 +1,202 @@
+import threading
+
+import numpy as np
+
+from rapid_gwm_build.trace import count_bytes_read
+
+# coordinate variable names, in order of preference
+X_NAMES = ("x", "lon", "longitude", "easting")
+Y_NAMES = ("y", "lat", "latitude", "northing")
+TIME_NAMES = ("time", "t")
+
+
+def _netcdf4():
+    try:
+        import netCDF4
+    except ImportError as e:
+        raise ImportError("netCDF4 is required to read NetCDF inputs (pip install netCDF4).") from e
+    return netCDF4
+
+
+def _find(names, candidates, kind):
+    for name in candidates:
+        if name in names:
+            return name
+    raise KeyError(f"No {kind} coordinate found (looked for {', '.join(candidates)}). Set it with the '{kind}' open kwarg.")
+
+
+def _nearest(coords: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Index of the nearest coordinate of each value (-1 if the value is outside the coordinates
+    by more than half a spacing). Coordinates can be ascending or descending.
+    """
+    order = np.argsort(coords)
+    sorted_coords = coords[order]
+    pos = np.clip(np.searchsorted(sorted_coords, values), 1, len(coords) - 1) if len(coords) > 1 else np.zeros(len(values), int)
+    if len(coords) > 1:
+        left, right = sorted_coords[pos - 1], sorted_coords[pos]
+        pos = np.where(np.abs(values - left) <= np.abs(values - right), pos - 1, pos)
+    idx = order[pos]
+    half = np.abs(np.diff(sorted_coords)).max() / 2 if len(coords) > 1 else np.inf
+    outside = (values < sorted_coords[0] - half) | (values > sorted_coords[-1] + half)
+    return np.where(outside, -1, idx)
+
+
+class NetCDFVariable:
+    """
+    Sliceable handle to a variable of a NetCDF file: indexing reads only the chunks covering the
+    requested slice (ie. `var[12]` reads a single time step).
+    """
+    def __init__(self, handle, name: str):
+        self.handle = handle
+        self.name = name
+        self.dims, self.shape, self.dtype = handle._variables[name]
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key) -> np.ndarray:
+        with self.handle._lock:
+            data = self.handle._dataset().variables[self.name][key]
+        count_bytes_read(int(np.size(data)) * self.dtype.itemsize)
+        if np.ma.isMaskedArray(data):
+            data = np.ma.filled(data.astype(float), np.nan)
+        return np.asarray(data)
+
+    def __repr__(self):
+        return f"NetCDFVariable({self.name}, dims={self.dims}, shape={self.shape})"
+
+
+class NetCDFHandle:
+    """
+    Lazy handle to a NetCDF file of gridded (time-varying) data. Opening only reads the metadata
+    and the coordinates, variables are read per time step and per model window.
+
+    The grid coordinates must be in the coordinate system of the file (no reprojection), and cells
+    take the value of the nearest data point.
+    """
+    lazy = True  # the data is read on demand (bytes are counted by the reads)
+
+    def __init__(self, filepath, x: str = None, y: str = None, time: str = None):
+        """
+        :param x, y, time: Names of the coordinate variables (default: detected from common names).
+        """
+        netCDF4 = _netcdf4()
+        self.filepath = filepath
+        self._ds = None
+        self._lock = threading.RLock()  # the netCDF library is not thread-safe
+
+        with netCDF4.Dataset(filepath, "r") as ds:
+            self._variables = {
+                name: (var.dimensions, var.shape, np.dtype(var.dtype)) for name, var in ds.variables.items()
+            }
+            self.x_name = x or _find(ds.variables, X_NAMES, "x")
+            self.y_name = y or _find(ds.variables, Y_NAMES, "y")
+            self.time_name = time or next((n for n in TIME_NAMES if n in ds.dimensions), None)
+            self.x = np.asarray(ds.variables[self.x_name][:], dtype=float)
+            self.y = np.asarray(ds.variables[self.y_name][:], dtype=float)
+            self.ntime = len(ds.dimensions[self.time_name]) if self.time_name else 0
+            self._x_dim = ds.variables[self.x_name].dimensions[0]
+            self._y_dim = ds.variables[self.y_name].dimensions[0]
+
+    def _dataset(self):
+        if self._ds is None:
+            self._ds = _netcdf4().Dataset(self.filepath, "r")
+        return self._ds
+
+    @property
+    def variables(self) -> list:
+        return list(self._variables)
+
+    def __getitem__(self, name: str) -> NetCDFVariable:
+        if name not in self._variables:
+            raise KeyError(f"Variable '{name}' not found in {self.filepath}.")
+        return NetCDFVariable(self, name)
+
+    def times(self):
+        """
+        Returns the decoded times (cftime/datetime objects), None without a time coordinate.
+        """
+        if self.time_name is None or self.time_name not in self._variables:
+            return None
+        with self._lock:
+            var = self._dataset().variables[self.time_name]
+            return _netcdf4().num2date(var[:], var.units, getattr(var, "calendar", "standard"))
+
+    def window(self, xorigin, yorigin, delr, delc) -> tuple:
+        """
+        Indices of the data points of every cell of a structured grid.
+        :return: (row slice, column slice, row index per grid row, column index per grid column),
+            indices relative to the slices (-1 for cells outside the data).
+        """
+        xc = xorigin + np.cumsum(delr) - np.asarray(delr) / 2
+        yc = yorigin - (np.cumsum(delc) - np.asarray(delc) / 2)
+        cols, rows = _nearest(self.x, xc), _nearest(self.y, yc)
+        if (cols < 0).all() or (rows < 0).all():
+            raise ValueError(f"The grid does not overlap the data of {self.filepath}.")
+        c0, c1 = cols[cols >= 0].min(), cols[cols >= 0].max() + 1
+        r0, r1 = rows[rows >= 0].min(), rows[rows >= 0].max() + 1
+        return slice(r0, r1), slice(c0, c1), np.where(rows >= 0, rows - r0, -1), np.where(cols >= 0, cols - c0, -1)
+
+    def read_step(self, name: str, t, xorigin, yorigin, delr, delc, window: tuple = None) -> np.ndarray:
+        """
+        Read a variable at time step t for the cells of a structured grid, only reading the chunks of
+        the window covering the grid. Other dimensions (ie. a single level) take their first index.
+        :param t: Time index, or a slice (the mean over the time steps is returned).
+        :param window: Result of `window` (computed if not given).
+        :return: Array of shape (nrow, ncol), NaN outside the data.
+        """
+        var = self[name]
+        row_slice, col_slice, rows, cols = window or self.window(xorigin, yorigin, delr, delc)
+        key = []
+        for dim in var.dims:
+            if dim == self.time_name:
+                key.append(t)
+            elif dim == self._y_dim:
+                key.append(row_slice)
+            elif dim == self._x_dim:
+                key.append(col_slice)
+            else:
+                key.append(0)
+        data = var[tuple(key)]
+
+        dims = [d for d, k in zip(var.dims, key) if isinstance(k, slice)]  # dimensions left in the data
+        if self.time_name in dims:
+            data = np.nanmean(data, axis=dims.index(self.time_name))
+            dims.remove(self.time_name)
+        if dims == [self._x_dim, self._y_dim]:
+            data = data.T
+
+        out = data[np.ix_(np.maximum(rows, 0), np.maximum(cols, 0))].astype(float)
+        out[rows < 0, :] = np.nan
+        out[:, cols < 0] = np.nan
+        return out
+
+    def close(self):
+        with self._lock:
+            if self._ds is not None:
+                self._ds.close()
+                self._ds = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_ds"] = None
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __repr__(self):
+        return f"NetCDFHandle({self.filepath}, {len(self._variables)} variables, {self.ntime} time steps)"
@@ -0,0 +1,144 @@
+import logging
+import math
+
+import numpy as np
+
+from rapid_gwm_build.trace import count_bytes_read
+
+DEFAULT_MAX_BYTES = 256 * 1024**2  # source pixels read at once by read_grid
+
+
+def _rasterio():
+    try:
+        import rasterio
+    except ImportError as e:
+        raise ImportError("rasterio is required to read raster inputs (pip install rasterio).") from e
+    return rasterio
+
+
+class RasterHandle:
+    """
+    Lazy handle to a raster file (ie. a DEM for the mesh top). Opening only reads the metadata,
+    data is read with `read_grid` for the window covering a model grid.
+
+    The grid coordinates must be in the raster's CRS (rasters are not reprojected).
+    """
+    lazy = True  # the data is read on demand (bytes are counted by the reads)
+
+    def __init__(self, filepath, band: int = 1, resampling: str = "average", max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        :param band: Band to read (1-based).
+        :param resampling: rasterio resampling method from the raster to uniform grid cells (ie. 'average',
+            'bilinear', 'nearest'). Non-uniform grids are sampled at the cell centers.
+        :param max_bytes: Max bytes of source pixels read at once. Larger windows are read in strips of grid rows.
+        """
+        rasterio = _rasterio()
+        self.filepath = filepath
+        self.band = band
+        self.resampling = resampling
+        self.max_bytes = max_bytes
+        with rasterio.open(filepath) as src:
+            self.transform = src.transform
+            self.width = src.width
+            self.height = src.height
+            self.crs = src.crs
+            self.nodata = src.nodata
+            self.dtype = np.dtype(src.dtypes[band - 1])
+            self.block_shape = src.block_shapes[band - 1]
+
+    @property
+    def shape(self) -> tuple:
+        return self.height, self.width
+
+    @property
+    def bounds(self) -> tuple:
+        """(left, bottom, right, top) of the raster."""
+        t = self.transform
+        xs = (t.c, t.c + t.a * self.width)
+        ys = (t.f, t.f + t.e * self.height)
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def window(self, left, bottom, right, top):
+        """
+        Returns the rasterio window (in source pixels, not clipped to the raster) covering the bounds.
+        """
+        from rasterio.windows import from_bounds
+
+        return from_bounds(left, bottom, right, top, transform=self.transform)
+
+    def read_grid(self, xorigin, yorigin, delr, delc, out: np.ndarray = None) -> np.ndarray:
+        """
+        Read the raster values of the cells of a structured grid, only reading the source blocks
+        covering the grid footprint. Cells outside the raster or on nodata are NaN.
+        :param xorigin: x of the upper-left corner of the grid.
+        :param yorigin: y of the upper-left corner of the grid.
+        :param delr: Column widths (array or scalar with `out`).
+        :param delc: Row heights (array or scalar with `out`).
+        :param out: Array (ie. a np.memmap for grids larger than memory) to fill, shape (nrow, ncol).
+        :return: Array of shape (nrow, ncol).
+        """
+        rasterio = _rasterio()
+        from rasterio.enums import Resampling
+
+        nrow, ncol = out.shape if out is not None else (np.size(delc), np.size(delr))
+        delr = np.broadcast_to(np.asarray(delr, dtype=float), (ncol,))
+        delc = np.broadcast_to(np.asarray(delc, dtype=float), (nrow,))
+        x_edges = xorigin + np.concatenate([[0.0], np.cumsum(delr)])
+        y_edges = yorigin - np.concatenate([[0.0], np.cumsum(delc)])
+        uniform = np.allclose(delr, delr[0]) and np.allclose(delc, delc[0])
+        if out is None:
+            out = np.empty((nrow, ncol), dtype=float)
+
+        # strips of grid rows so at most max_bytes of source pixels are read at once
+        pixel_w, pixel_h = abs(self.transform.a), abs(self.transform.e)
+        row_bytes = (x_edges[-1] - x_edges[0]) / pixel_w * delc.max() / pixel_h * self.dtype.itemsize
+        rows_per_strip = max(1, min(nrow, int(self.max_bytes // max(row_bytes, 1.0))))
+        resampling = Resampling[self.resampling]
+
+        with rasterio.open(self.filepath) as src:
+            for r0 in range(0, nrow, rows_per_strip):
+                r1 = min(r0 + rows_per_strip, nrow)
+                window = self.window(x_edges[0], y_edges[r1], x_edges[-1], y_edges[r0])
+                if uniform:
+                    data = src.read(
+                        self.band, window=window, out_shape=(r1 - r0, ncol), resampling=resampling,
+                        boundless=True, masked=True)
+                else:
+                    data = self._sample_centers(src, window, x_edges, y_edges[r0:r1 + 1])
+                count_bytes_read(self._window_bytes(window))
+                out[r0:r1] = np.ma.filled(data.astype(float), np.nan)
+        logging.debug(f"Read {self.filepath} for a {nrow}x{ncol} grid in {math.ceil(nrow / rows_per_strip)} strip(s).")
+        return out
+
+    def _sample_centers(self, src, window, x_edges, y_edges) -> np.ndarray:
+        # native resolution window, then the pixel under each cell center
+        window = window.round_offsets().round_lengths()
+        data = src.read(self.band, window=window, boundless=True, masked=True)
+        transform = src.window_transform(window)
+        xc = (x_edges[:-1] + x_edges[1:]) / 2
+        yc = (y_edges[:-1] + y_edges[1:]) / 2
+        cols = np.floor((xc - transform.c) / transform.a).astype(int)
+        rows = np.floor((yc - transform.f) / transform.e).astype(int)
+        cols = np.clip(cols, 0, data.shape[1] - 1)
+        rows = np.clip(rows, 0, data.shape[0] - 1)
+        return data[np.ix_(rows, cols)]
+
+    def _window_bytes(self, window) -> int:
+        # source pixels inside the raster
+        col0, row0 = max(window.col_off, 0), max(window.row_off, 0)
+        col1 = min(window.col_off + window.width, self.width)
+        row1 = min(window.row_off + window.height, self.height)
+        return int(max(col1 - col0, 0) * max(row1 - row0, 0) * self.dtype.itemsize)
+
+    def read(self) -> np.ndarray:
+        """
+        Read the whole band (only for small rasters).
+        """
+        rasterio = _rasterio()
+        with rasterio.open(self.filepath) as src:
+            data = src.read(self.band, masked=True)
+        count_bytes_read(data.size * self.dtype.itemsize)
+        return np.ma.filled(data.astype(float), np.nan)
+
+    def __repr__(self):
+        return f"RasterHandle({self.filepath}, {self.height}x{self.width}, band {self.band})"
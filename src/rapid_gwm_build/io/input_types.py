@@ -7,6 +7,8 @@ from abc import ABC, abstractmethod
 
 # import FileTypeFactory
 from ..io.filepath.filetype_factory import filetype_factory
+from ..trace import count_bytes_read
+from .read_cache import read_cache
 
 # --- InputValueSpec Classes ---
 @dataclass
@@ -68,7 +70,14 @@ class FilepathInput(InputValueSpec):
         return cls(value=value)
     
     def open(self):
-        return filetype_factory.open(self.filepath, self.open_kwargs)
+        # files referenced from several places are read once (the data is shared, read-only)
+        return read_cache.open(self.filepath, self.open_kwargs, self._read)
+
+    def _read(self):
+        data = filetype_factory.open(self.filepath, self.open_kwargs)
+        if not getattr(data, "lazy", False):  # lazy handles count the bytes they read
+            count_bytes_read(os.path.getsize(self.filepath))
+        return data
 
 
 # @dataclass
@@ -0,0 +1,229 @@
+import errno
+import logging
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from rapid_gwm_build.cache import default_cache_dir, hash_file
+
+FICLONE = 0x40049409  # linux ioctl to clone (reflink) a file on copy-on-write filesystems (btrfs, xfs)
+LINK_MODES = ("hardlink", "reflink", "copy")
+LINKS_MARKER = ".objects_linked"  # written to directories with files hard linked to a store
+
+
+def _reflink(src, dst):
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflinks are only supported on linux")
+    import fcntl
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            os.remove(dst)
+            raise
+
+
+def _list_files(directory) -> list:
+    # paths relative to the directory, without the temporary files of the store
+    files = []
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            if (filename.startswith(".") and filename.endswith(".tmp")) or filename == LINKS_MARKER:
+                continue
+            files.append(os.path.relpath(os.path.join(root, filename), directory))
+    return sorted(files)
+
+
+class ObjectStore:
+    """
+    Content-addressed store for files written to model workspaces.
+
+    Files are hashed into the store and replaced by hard links (or reflinks, or copies when the
+    file system supports neither) to the stored object, so byte-identical files across workspaces
+    (scenarios, realizations, several simulations) are only stored once.
+
+    Hard-linked files share their contents: files must be replaced rather than modified in place
+    (`Simulation.write` detaches linked files before writing). Stored objects are read-only so that
+    in-place writes to a linked file fail rather than change every workspace sharing it. Only the
+    files written by `Simulation.write` are linked, model outputs (ie. heads and budgets rewritten by
+    MF6 runs) are not.
+    """
+    def __init__(self, store_dir=None, mode: str = "hardlink"):
+        """
+        :param store_dir: Directory of the stored objects (must be on the same file system as the
+            workspaces for hard links).
+        :param mode: 'hardlink', 'reflink' (copy-on-write clones) or 'copy'.
+        """
+        if mode not in LINK_MODES:
+            raise ValueError(f"Invalid link mode '{mode}'. Expected one of {LINK_MODES}.")
+        self.store_dir = Path(store_dir) if store_dir else default_cache_dir() / "objects"
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+
+        self.objects_added = 0
+        self.files_linked = 0
+        self.bytes_saved = 0
+        self._known = {}  # (device, inode, size, mtime) -> object path, avoids re-hashing linked files
+
+    def _object_path(self, digest: str) -> Path:
+        return self.store_dir / digest[:2] / digest
+
+    def _clone(self, src, dst):
+        # falls back from hard links to reflinks to copies
+        if self.mode == "hardlink":
+            try:
+                os.link(src, dst)
+                return
+            except OSError:
+                pass
+        if self.mode in ("hardlink", "reflink"):
+            try:
+                _reflink(src, dst)
+                return
+            except OSError:
+                pass
+        shutil.copyfile(src, dst)
+
+    def add(self, filepath) -> Path:
+        """
+        Add a file to the store (if its contents are not stored yet) and return the object path.
+        """
+        stat = os.stat(filepath)
+        file_id = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        obj = self._known.get(file_id)
+        if obj is not None and obj.exists():
+            return obj
+
+        obj = self._object_path(hash_file(filepath))
+        self._known[file_id] = obj
+        if not obj.exists():
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            tmp = obj.with_name(f".{obj.name}.{os.getpid()}.tmp")
+            self._clone(filepath, tmp)
+            os.chmod(tmp, 0o444)
+            os.replace(tmp, obj)
+            self.objects_added += 1
+        return obj
+
+    def place(self, obj, filepath):
+        """
+        Replace (or create) filepath with a link to the stored object.
+        """
+        filepath = Path(filepath)
+        if filepath.exists() and os.path.samefile(obj, filepath):
+            return
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        tmp = filepath.with_name(f".{filepath.name}.{os.getpid()}.tmp")
+        self._clone(obj, tmp)
+        os.replace(tmp, filepath)
+
+    def link(self, filepath) -> bool:
+        """
+        Deduplicate a single file. Returns True if identical contents were already stored.
+        """
+        size = os.path.getsize(filepath)
+        known = self.objects_added
+        obj = self.add(filepath)
+        if self.mode != "copy":
+            self.place(obj, filepath)
+            self.files_linked += 1
+        if self.objects_added == known:
+            self.bytes_saved += size
+            return True
+        return False
+
+    def dedup(self, directory, files: list = None) -> dict:
+        """
+        Deduplicate the files of a directory (ie. a model workspace).
+        :param files: Paths relative to the directory (ie. `Simulation.written_files`). Default: every
+            file, only use it for directories without model outputs (outputs are rewritten in place).
+        """
+        files = _list_files(directory) if files is None else files
+        self._mark_links(directory)
+        dedup = 0
+        for relpath in files:
+            dedup += self.link(os.path.join(directory, relpath))
+        logging.debug(f"Deduplicated {dedup} of {len(files)} files in {directory}.")
+        return {"files": len(files), "deduplicated": dedup}
+
+    def link_tree(self, src_dir, dst_dir, files: list = None, overwrite: bool = False):
+        """
+        Populate dst_dir with links to the (stored) files of src_dir. Existing files are kept unless overwrite is set.
+        :param files: Paths relative to src_dir (default: every file, see `dedup`).
+        """
+        src_dir = Path(src_dir)
+        self._mark_links(dst_dir)
+        for relpath in _list_files(src_dir) if files is None else files:
+            src = src_dir / relpath
+            dst = Path(dst_dir) / relpath
+            if dst.exists() and not overwrite:
+                continue
+            self.place(self.add(src), dst)
+            self.files_linked += 1
+            self.bytes_saved += src.stat().st_size
+
+    def _mark_links(self, directory):
+        # reflinks and copies are private to the directory, only hard links need detaching
+        if self.mode == "hardlink":
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            (Path(directory) / LINKS_MARKER).touch()
+
+    @staticmethod
+    def has_links(directory) -> bool:
+        """
+        True if files of the directory may be hard linked to a store (see `detach`).
+        """
+        return (Path(directory) / LINKS_MARKER).exists()
+
+    @staticmethod
+    def snapshot(directory) -> dict:
+        """
+        Stat of every file in a directory, to find the files written afterwards (see `changed_files`).
+        """
+        snapshot = {}
+        for relpath in _list_files(directory):
+            stat = os.stat(os.path.join(directory, relpath))
+            snapshot[relpath] = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    @staticmethod
+    def changed_files(directory, snapshot: dict) -> list:
+        """
+        Files of a directory created or modified since the snapshot.
+        """
+        changed = []
+        for relpath in _list_files(directory):
+            stat = os.stat(os.path.join(directory, relpath))
+            if snapshot.get(relpath) != (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+                changed.append(relpath)
+        return changed
+
+    @staticmethod
+    def detach(directory):
+        """
+        Replace hard-linked files in a directory by private copies so they can be modified in place.
+        Only needed for directories marked by `dedup` or `link_tree` (see `has_links`).
+        """
+        for root, _, filenames in os.walk(directory):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                if os.stat(path).st_nlink > 1:
+                    tmp = os.path.join(root, f".{filename}.{os.getpid()}.tmp")
+                    shutil.copyfile(path, tmp)
+                    os.replace(tmp, path)
+        marker = Path(directory) / LINKS_MARKER
+        if marker.exists():
+            marker.unlink()
+
+    def stats(self) -> dict:
+        return {
+            "objects_added": self.objects_added,
+            "files_linked": self.files_linked,
+            "bytes_saved": self.bytes_saved,
+        }
+
+    def __repr__(self):
+        return f"ObjectStore({self.store_dir}, mode={self.mode})"
@@ -0,0 +1,142 @@
+import logging
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+from rapid_gwm_build.cache import stable_repr
+
+
+def _freeze(data):
+    """
+    Make numpy arrays (also inside dicts, lists and tuples) read-only. Other objects (ie. DataFrames)
+    are shared as they are and must not be modified in place.
+    """
+    if hasattr(data, "flags") and hasattr(data, "dtype") and hasattr(data.flags, "writeable"):
+        data.flags.writeable = False
+    elif isinstance(data, dict):
+        for value in data.values():
+            _freeze(value)
+    elif isinstance(data, (list, tuple)):
+        for value in data:
+            _freeze(value)
+    return data
+
+
+def _reference(data):
+    # arrays and DataFrames are only cached while a node holds them (so released and spilled
+    # data is freed), None for objects which cannot be weakly referenced (ie. parsed YAML)
+    try:
+        return weakref.ref(data)
+    except TypeError:
+        return None
+
+
+class ReadCache:
+    """
+    Process-level cache of opened input files, so a file referenced from several places (ie. the
+    same array for the mesh and dis, or the same CSV for several pipelines) is read once.
+
+    Entries are keyed on (absolute path, mtime, size, open kwargs), a modified file is read again.
+    Every consumer receives the same object: numpy arrays are made read-only. Objects which cannot
+    be weakly referenced are kept for the `max_strong` most recently read files only.
+    """
+    def __init__(self, max_strong: int = 32):
+        self.enabled = True
+        self.max_strong = max_strong
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0  # file bytes not read again
+
+        self._entries = {}  # key -> reference to the data
+        self._strong = OrderedDict()  # key -> data which cannot be weakly referenced, oldest first
+        self._keys = {}  # absolute path -> key of its current entry
+        self._key_locks = {}  # key -> lock, a file is read by a single thread
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(filepath, open_kwargs=None) -> tuple:
+        path = os.path.abspath(filepath)
+        stat = os.stat(path)
+        return path, stat.st_mtime_ns, stat.st_size, stable_repr(open_kwargs or {})
+
+    def open(self, filepath, open_kwargs, read):
+        """
+        Returns the data of a file, calling read() if it is not cached.
+        :param read: Function reading the file (called without arguments).
+        """
+        if not self.enabled:
+            return read()  # not shared, left writeable
+
+        key = self.key(filepath, open_kwargs)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            try:
+                return self._load(key, read)
+            finally:
+                # later readers find the entry, the lock is only needed while the file is read
+                with self._lock:
+                    if self._key_locks.get(key) is key_lock:
+                        del self._key_locks[key]
+
+    def _load(self, key, read):
+        with self._lock:
+            ref = self._entries.get(key)
+            data = ref() if ref is not None else self._strong.get(key)
+            if data is not None:
+                if key in self._strong:
+                    self._strong.move_to_end(key)
+                self.hits += 1
+                self.bytes_saved += key[2]
+        if data is not None:
+            logging.debug(f"Read cache hit for {key[0]}.")
+            return data
+
+        data = _freeze(read())
+        with self._lock:
+            self.misses += 1
+            old_key = self._keys.get(key[0])
+            if old_key is not None and old_key[:3] != key[:3]:
+                # the file has changed, drop the data of every previous version
+                for k in [k for k in {*self._entries, *self._strong} if k[0] == key[0] and k[:3] != key[:3]]:
+                    self._entries.pop(k, None)
+                    self._strong.pop(k, None)
+            self._keys[key[0]] = key
+            if data is not None:
+                ref = _reference(data)
+                if ref is not None:
+                    self._entries[key] = ref
+                else:
+                    self._strong[key] = data
+                    while len(self._strong) > self.max_strong:
+                        self._strong.popitem(last=False)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._strong.clear()
+            self._keys.clear()
+            self._key_locks.clear()
+            self.hits = 0
+            self.misses = 0
+            self.bytes_saved = 0
+
+    def __len__(self):
+        return sum(1 for ref in self._entries.values() if ref() is not None) + len(self._strong)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self),
+            "bytes_saved": self.bytes_saved,
+        }
+
+    def __repr__(self):
+        return f"ReadCache({len(self)} entries, {self.hits} hits, {self.misses} misses)"
+
+
+read_cache = ReadCache()
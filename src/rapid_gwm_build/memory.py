@@ -0,0 +1,164 @@
+import itertools
+import logging
+import os
+import threading
+from pathlib import Path
+
+
+class ReleaseTracker:
+    """
+    Reference counts how many downstream nodes of a build still need the data of each node,
+    and releases the data of a node once the count reaches zero. Peak memory then follows the
+    frontier of the build rather than the size of the whole graph.
+    """
+    def __init__(self, graph, node_ids: list, nodes: dict, keep=()):
+        """
+        :param graph: The graph being built (only edges between node_ids are counted).
+        :param node_ids: The node IDs which are resolved in this build.
+        :param nodes: The id -> node index of the simulation.
+        :param keep: Node IDs which are never released (ie. module nodes and build targets).
+        """
+        build_ids = set(node_ids)
+        self.graph = graph
+        self.nodes = nodes
+        self.keep = set(keep)
+        self.released = []
+        self._remaining = {
+            n_id: sum(1 for succ in graph.successors(n_id) if succ in build_ids) for n_id in build_ids
+        }
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _is_reference(data) -> bool:
+        # nodes whose data is a reference (ie. '@mesh.delr') are read through by downstream nodes
+        return isinstance(data, str) and data.startswith("@")
+
+    def done(self, node_id: str):
+        """
+        Called once a node has been resolved (or skipped). Releases any upstream node which is
+        no longer needed by the rest of the build.
+        """
+        node = self.nodes[node_id]
+        node.release_intermediate()
+
+        # a reference node keeps its upstream nodes alive until it is released itself
+        if not self._is_reference(node._data):
+            self._decrement(node_id)
+
+    def _decrement(self, node_id: str):
+        to_release = []
+        with self._lock:
+            for dep_id in self.graph.predecessors(node_id):
+                if dep_id not in self._remaining:
+                    continue
+                self._remaining[dep_id] -= 1
+                if self._remaining[dep_id] == 0 and dep_id not in self.keep:
+                    to_release.append(dep_id)
+            self.released.extend(to_release)
+
+        for dep_id in to_release:
+            dep_node = self.nodes[dep_id]
+            is_reference = self._is_reference(dep_node._data)
+            dep_node.release()
+            logging.debug(f"Node {dep_id} data released.")
+            if is_reference:
+                self._decrement(dep_id)
+
+
+class SpillManager:
+    """
+    Keeps the NumPy node data held in memory under a budget by spilling large arrays to .npy
+    files and replacing the node data with a copy-on-write np.memmap of the file.
+
+    Arrays are spilled as they are resolved (before downstream nodes take a reference to them),
+    so downstream pipes and modules transparently receive the memmapped array.
+    """
+    def __init__(self, spill_dir, budget: int, min_size: int = 1024**2):
+        """
+        :param spill_dir: Directory for the spilled .npy files.
+        :param budget: Max bytes of in-memory array data before arrays are spilled.
+        :param min_size: Arrays smaller than this are never spilled.
+        """
+        self.spill_dir = Path(spill_dir)
+        self.budget = budget
+        self.min_size = min_size
+        self.spilled = {}  # node_id -> path of the spilled file
+        self._resident = {}  # id(base array) -> (base array, nbytes, node IDs holding it or a view of it)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def resident(self) -> int:
+        """Bytes of array data currently held in memory by tracked nodes."""
+        return sum(nbytes for _, nbytes, _ in self._resident.values())
+
+    @staticmethod
+    def _base(arr):
+        # the array owning the memory of arr (views and aliases of an array share its base)
+        import numpy as np
+
+        while isinstance(arr.base, np.ndarray):
+            arr = arr.base
+        return arr
+
+    def _holds(self, node, base) -> bool:
+        import numpy as np
+
+        return node is not None and isinstance(node._data, np.ndarray) and self._base(node._data) is base
+
+    def _prune(self, nodes: dict):
+        # forget arrays which are no longer held by any node (ie. released or rebuilt)
+        for key, (base, nbytes, node_ids) in list(self._resident.items()):
+            node_ids = {n_id for n_id in node_ids if self._holds(nodes.get(n_id), base)}
+            if node_ids:
+                self._resident[key] = (base, nbytes, node_ids)
+            else:
+                del self._resident[key]
+
+    def track(self, node, nodes: dict):
+        """
+        Account for the data of a freshly resolved node, spilling it if the budget is exceeded.
+
+        Arrays are counted once per base array, so nodes sharing an array (ie. a pipeline and its
+        last pipe, or a mesh attribute and its input) do not count twice toward the budget.
+        """
+        import numpy as np
+
+        data = node._data
+        if not isinstance(data, np.ndarray) or data.dtype.hasobject:
+            return
+        base = self._base(data)
+        if isinstance(base, np.memmap):
+            return
+
+        with self._lock:
+            self._prune(nodes)
+            entry = self._resident.get(id(base))
+            if entry is not None:
+                entry[2].add(node.id)
+                return
+            if base.nbytes >= self.min_size and self.resident + base.nbytes > self.budget:
+                # point every node holding the array at the memmap, else spilling frees nothing
+                spilled = self._spill(node.id, data)
+                for other in {**nodes, node.id: node}.values():
+                    other.replace_data(data, spilled)
+            else:
+                self._resident[id(base)] = (base, base.nbytes, {node.id})
+
+    def _spill(self, node_id: str, data):
+        import numpy as np
+
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        # unique file names: an older file may still be memory-mapped by a previous build
+        path = self.spill_dir / f"{node_id}.{next(self._counter)}.npy"
+        np.save(path, data)
+
+        old_path = self.spilled.get(node_id)
+        if old_path is not None:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+        self.spilled[node_id] = path
+        logging.debug(f"Node {node_id} data ({data.nbytes} bytes) spilled to {path}.")
+        return np.load(path, mmap_mode="c")
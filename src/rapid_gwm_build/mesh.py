@@ -1,5 +1,4 @@
 import numpy as np
-import gridit as gi
 
 
 class Mesh:
@@ -28,11 +27,11 @@ class Mesh:
         self.delr = delr if delr is not None else np.ones(ncol) * resolution
         self.delc = delc if delc is not None else np.ones(nrow) * resolution
 
-        self.top = top
-        self.bottoms = self._set_bottoms(bottoms)
         self.xorigin = xorigin
         self.yorigin = yorigin
-        self.active_domain = active_domain
+        self.top = self._on_grid(top)
+        self.bottoms = self._set_bottoms(self._on_grid(bottoms))
+        self.active_domain = self._on_grid(active_domain)
 
         # create grid
         self.grid = self._make2DGrid()
@@ -65,10 +64,20 @@ class Mesh:
             cfg=cfg
         )
     
+    def _on_grid(self, value):
+        """
+        Read lazy inputs (ie. a RasterHandle of a DEM) for the grid footprint only.
+        """
+        if hasattr(value, "read_grid"):
+            return value.read_grid(self.xorigin, self.yorigin, self.delr, self.delc)
+        return value
+
     def _make2DGrid(self):
         """
         Create a 2D grid based on the mesh parameters.
         """
+        import gridit as gi
+
         xy_shape = (self.ncol, self.nrow)
         return gi.Grid(resolution=self.resolution, shape=xy_shape, top_left=(self.xorigin, self.yorigin))
 
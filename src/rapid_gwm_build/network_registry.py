@@ -1,14 +1,20 @@
 
-import networkx as nx
-
 from rapid_gwm_build.nodes.node_base import NodeCFG
 from rapid_gwm_build.pipes.pipeline_node import PipelineNode
 
 class NetworkRegistry:
     def __init__(self):
         """Initialize the NetworkRegistry with an empty directed graph."""
+        import networkx as nx
+
         self._graph = nx.DiGraph()
 
+        # indexes which are maintained by add_node/remove_node
+        self._nodes = {}  # node_id -> NodeCFG
+        self._type_index = {}  # node type -> set of node_ids
+        self._prefix_index = {}  # dotted prefix (ie. 'module.gwf') -> set of node_ids
+        self._subgraph = None  # cached ancestor closure of the module nodes
+
         self._allowed_types = [
             'input',
             'mesh',
@@ -22,24 +28,27 @@ class NetworkRegistry:
     
     @property
     def subgraph(self):
-        module_nodes = [n_id for n_id, data in self._graph.nodes.data() if data['node'].type == 'module']
-        
-        def get_adj_nodes(in_list, master_nodes):
-            
-            for n_id in in_list:
-                adj_nodes = list(self._graph.predecessors(n_id))
-                master_nodes.extend(adj_nodes)
-                master_nodes = get_adj_nodes(adj_nodes, master_nodes)
-            return master_nodes
-        
-        master_nodes = get_adj_nodes(module_nodes, module_nodes)
-
-        # get unique
-        subset_nodes = list(dict.fromkeys(master_nodes))
-        return self._graph.subgraph(subset_nodes)
+        """
+        The subgraph of the module nodes and all of their upstream nodes (ie. the nodes which are built).
+        Cached until the graph is modified.
+        """
+        if self._subgraph is None:
+            module_nodes = self._type_index.get('module', ())
+            self._subgraph = self._graph.subgraph(self.ancestors(module_nodes))
+        return self._subgraph
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_subgraph'] = None  # cached view, rebuilt on demand
+        return state
+
+    def _clear_cache(self):
+        """Clear cached views of the graph. Called whenever nodes or edges change."""
+        self._subgraph = None
 
     
     def plot(self, subgraph=False, **kwargs):
+        import networkx as nx
         from matplotlib import pyplot as plt
 
         if subgraph:
@@ -84,7 +93,12 @@ class NetworkRegistry:
         :param node: The node identifier (e.g., a string or number).
         :param attributes: Additional attributes to associate with the node.
         """
-        self._graph.add_node(ncfg.id, node=ncfg)
+        node_id = ncfg.id
+        if node_id in self._nodes:
+            self._unindex(node_id)
+        self._graph.add_node(node_id, node=ncfg)
+        self._index(node_id, ncfg)
+        self._clear_cache()
 
     def remove_node(self, node):
         """
@@ -95,6 +109,70 @@ class NetworkRegistry:
         if node not in self._graph:
             raise KeyError(f"Node '{node}' does not exist in the graph.")
         self._graph.remove_node(node)
+        self._unindex(node)
+        self._clear_cache()
+
+    @staticmethod
+    def _prefixes(node_id):
+        parts = node_id.split(".")
+        return [".".join(parts[:i]) for i in range(1, len(parts))]
+
+    def _index(self, node_id, ncfg):
+        self._nodes[node_id] = ncfg
+        self._type_index.setdefault(ncfg.type, set()).add(node_id)
+        for prefix in self._prefixes(node_id):
+            self._prefix_index.setdefault(prefix, set()).add(node_id)
+
+    def _unindex(self, node_id):
+        ncfg = self._nodes.pop(node_id, None)
+        if ncfg is not None:
+            self._type_index.get(ncfg.type, set()).discard(node_id)
+        for prefix in self._prefixes(node_id):
+            self._prefix_index.get(prefix, set()).discard(node_id)
+
+    @property
+    def nodes(self):
+        """
+        The id -> node index of the graph. Do not modify this directly, use add_node/remove_node.
+        """
+        return self._nodes
+
+    def __contains__(self, node_id):
+        return node_id in self._nodes
+
+    def get_node(self, node_id, default=None):
+        """
+        Get the node configuration for a node ID.
+        :param node_id: The node identifier.
+        :param default: Returned if the node does not exist.
+        """
+        return self._nodes.get(node_id, default)
+
+    def find(self, node_id):
+        """
+        Find a node from a (reference) ID like '@module.gwf'. An exact match is returned first,
+        otherwise the unique node which has node_id as a prefix (ie. 'module.gwf.mygwf').
+        :param node_id: The node identifier, with or without the '@' prefix.
+        :return: The matching node ID or None.
+        :raises ValueError: If the ID matches more than one node.
+        """
+        if node_id.startswith("@"):
+            node_id = node_id[1:]
+        if node_id in self._nodes:
+            return node_id
+
+        matches = self._prefix_index.get(node_id)
+        if not matches:
+            return None
+        elif len(matches) > 1:
+            raise ValueError(f"Multiple matches found for {node_id}: {sorted(matches)}")
+        return next(iter(matches))
+
+    def list_type(self, ntype):
+        """
+        Get the IDs of all nodes of a type (ie. 'module').
+        """
+        return list(self._type_index.get(ntype, ()))
 
     def add_edge(self, source, target, **attributes):
         """
@@ -104,6 +182,7 @@ class NetworkRegistry:
         :param attributes: Additional attributes to associate with the edge.
         """
         self._graph.add_edge(source, target, **attributes)
+        self._clear_cache()
 
     def remove_edge(self, source, target):
         """
@@ -115,6 +194,7 @@ class NetworkRegistry:
         if not self._graph.has_edge(source, target):
             raise KeyError(f"Edge from '{source}' to '{target}' does not exist in the graph.")
         self._graph.remove_edge(source, target)
+        self._clear_cache()
 
     def module_registry(self):
         return [data['module'] for node, data in self._graph.nodes(data=True) if data.get('ntype') == 'module' and 'module' in data]
@@ -127,7 +207,7 @@ class NetworkRegistry:
         :return: A list of nodes that match the label and value.
         """
         if ntype:
-            return [node for node, attrs in self._graph.nodes(data=True) if attrs.get('ntype') == ntype]
+            return self.list_type(ntype)
         else:
             return list(self._graph.nodes)
 
@@ -142,6 +222,50 @@ class NetworkRegistry:
             raise KeyError(f"Node '{node}' does not exist in the graph.")
         return self._graph.nodes[node]
 
+    def ancestors(self, node_ids):
+        """
+        Get the IDs of the given nodes and all of their upstream nodes.
+        :param node_ids: The node identifiers.
+        :return: A set of node IDs.
+        :raises KeyError: If a node does not exist in the graph.
+        """
+        closure = set()
+        stack = []
+        for node_id in node_ids:
+            if node_id not in self._graph:
+                raise KeyError(f"Node '{node_id}' does not exist in the graph.")
+            stack.append(node_id)
+
+        while stack:
+            node_id = stack.pop()
+            if node_id in closure:
+                continue
+            closure.add(node_id)
+            stack.extend(self._graph.predecessors(node_id))
+        return closure
+
+    def invalidate(self, node_id):
+        """
+        Mark a node and all of its downstream nodes as dirty.
+        :param node_id: The node identifier.
+        :return: A set of the invalidated node IDs.
+        :raises KeyError: If the node does not exist in the graph.
+        """
+        if node_id not in self._graph:
+            raise KeyError(f"Node '{node_id}' does not exist in the graph.")
+        import networkx as nx
+
+        invalidated = {node_id} | nx.descendants(self._graph, node_id)
+        for n_id in invalidated:
+            self._nodes[n_id].invalidate()
+        return invalidated
+
+    def dirty_nodes(self):
+        """
+        List the IDs of all nodes which are marked as dirty.
+        """
+        return [n_id for n_id, node in self._nodes.items() if node.dirty]
+
     def list_edges(self):
         """
         List all edges in the graph.
@@ -156,4 +280,5 @@ class NetworkRegistry:
         # assume input nodes are already in the graph
         self.add_node(pnode.name, ntype="pipeline", data=pnode)
         self._graph.add_edges_from([(pnode.name, ikey) for ikey in pnode.inkeys])
-        self._graph.add_edges_from([(pnode.name, ikey) for ikey in pnode.outkeys])
\ No newline at end of file
+        self._graph.add_edges_from([(pnode.name, ikey) for ikey in pnode.outkeys])
+        self._clear_cache()
\ No newline at end of file
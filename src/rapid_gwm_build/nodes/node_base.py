@@ -6,6 +6,9 @@ class NodeCFG:
     """
     Class to represent a node ID in the GWM file.
     """
+    cacheable = True  # resolved data can be stored in the node cache
+    parallel_safe = True  # node can be resolved concurrently with other nodes
+
     def __init__(
             self,
             node_type: str,
@@ -23,6 +26,8 @@ class NodeCFG:
         self._dependencies = None
         self._name = None
         self._data = None  # will be loaded during execution
+        self._dirty = True  # node needs to be (re)resolved
+        self._released = False  # data was dropped after the build no longer needed it
 
 
         if module_key:
@@ -40,11 +45,50 @@ class NodeCFG:
             return True
         
     
+    @property
+    def dirty(self):
+        """True if the node has not been resolved since it (or an upstream node) changed."""
+        return self._dirty
+
+    def invalidate(self):
+        """Mark the node as needing to be resolved again."""
+        self._dirty = True
+
+    def mark_clean(self):
+        """Mark the node as resolved."""
+        self._dirty = False
+        self._released = False
+
+    @property
+    def released(self):
+        """True if the data was released during a memory-lean build."""
+        return self._released
+
+    def release(self):
+        """Drop the resolved data. The node is resolved again when a downstream node needs it."""
+        self._data = None
+        self._released = True
+
+    def release_intermediate(self):
+        """Drop any intermediate data kept after resolving. Override in subclasses."""
+        pass
+
+    def replace_data(self, old, new):
+        """
+        Swap the resolved data for an equivalent object (ie. a spilled memmap of the same array),
+        including any object the node reads its data from. Override in subclasses.
+        """
+        if self._data is old:
+            self._data = new
+
     @property
     def data(self):
         """Read-only property for data."""
         if self._data is None:
-            print("Data has not been built yet. Call 'build()' first.")
+            if self._released:
+                print("Data has been released to save memory. Call 'build()' to resolve it again.")
+            else:
+                print("Data has not been built yet. Call 'build()' first.")
             return None
         else:
             return self._data
@@ -222,6 +266,24 @@ class NodeCFG:
                     dependencies.append(node_id)
             return dependencies
     
+    def cache_key_items(self, **context) -> dict:
+        """
+        Returns the items which identify the resolved data of this node (used to fingerprint the node).
+        Subclasses should extend this with any kwargs which change the result of `resolve`.
+        """
+        return {
+            'type': self.type,
+            'id': self.id,
+            'src': self.src,
+        }
+
+    def cache_hit_valid(self, data) -> bool:
+        """
+        Returns False if data loaded from the node cache cannot be used as is (ie. files written
+        by `resolve` were deleted since), in which case the node is resolved again.
+        """
+        return True
+
     @abstractmethod
     def resolve(self, **kwargs):
         """
@@ -1,12 +1,24 @@
-import numpy as np
+import os
 import logging 
 
 from rapid_gwm_build import utils
-from rapid_gwm_build.io.input_types import InputValueSpec
+from rapid_gwm_build.io.input_types import InputValueSpec, FilepathInput
 from rapid_gwm_build.nodes.node_base import NodeCFG
 from rapid_gwm_build.io.user_input_factory import user_input_factory
 from rapid_gwm_build.pipes.pipe_registry import pipe_registry
-from rapid_gwm_build.mesh import Mesh
+
+
+def _output_files(data) -> list:
+    """Paths of the {'filename': path} entries of pipe outputs."""
+    if isinstance(data, dict):
+        files = [data['filename']] if isinstance(data.get('filename'), (str, os.PathLike)) else []
+        for value in data.values():
+            files.extend(_output_files(value))
+        return files
+    if isinstance(data, (list, tuple)):
+        return [path for value in data for path in _output_files(value)]
+    return []
+
 
 class PipeNode(NodeCFG):
     """
@@ -37,12 +49,17 @@ class PipeNode(NodeCFG):
         """
         func = pipe_registry.get(self.name)
 
-        # kwargs = {}
-        # for k, v in self.src.items():
-        #     if isinstance(v, str) and v.startswith("@"):
-        #         dep_node = sim_nodes.get(v[1:])
-        #         kwargs[k] = dep_node.data
-        
+        # node references in the pipe arguments (ie. mesh: '@mesh')
+        kwargs = {}
+        for k, v in self.src.items():
+            if isinstance(v, str) and v.startswith("@"):
+                dep_node = sim_nodes.get(v[1:])
+                if dep_node is None or dep_node.data is None:
+                    raise ValueError(f"Dependency node {v[1:]} of {self.id} is empty.")
+                kwargs[k] = dep_node.data
+            else:
+                kwargs[k] = v
+
         # Get the input data
         def resolve_input(input_id):
             if isinstance(input_id, str) and input_id.startswith("@"):
@@ -52,8 +69,26 @@ class PipeNode(NodeCFG):
 
         input_data = resolve_input(self.input_id)
 
-        self._data = func(input_data, node_id=self.id, outdir=derived_dir, **self.src)
-
+        # plugin pipes only receive the keywords they take (ie. not node_id/outdir or the step config
+        # keys of other pipes such as 'type') unless they take **kwargs
+        kwargs.update(node_id=self.id, outdir=derived_dir)
+        ignored = [k for k in kwargs if not pipe_registry.accepts(self.name, k)]
+        if ignored:
+            logging.debug(f"Pipe {self.name} of {self.id} does not take {ignored}, ignored.")
+        self._data = func(input_data, **{k: v for k, v in kwargs.items() if k not in ignored})
+
+    def cache_key_items(self, derived_dir=None, **context):
+        items = super().cache_key_items(**context)
+        items['input_id'] = self.input_id
+        items['outdir'] = derived_dir  # pipes can write files to the derived directory
+        return items
+
+    def cache_hit_valid(self, data) -> bool:
+        # pipes writing files return them as {'filename': path} entries (ie. {kper: {'filename': ...}})
+        missing = [path for path in _output_files(data) if not os.path.exists(path)]
+        if missing:
+            logging.debug(f"Files {missing} of {self.id} are missing, cache entry not used.")
+        return not missing
     
     def _get_dependencies(self):
         """
@@ -104,18 +139,33 @@ class PipelineNode(NodeCFG):
     
     
     def resolve(self, sim_nodes: dict=None, ref_dir=None, derived_dir=None, **kwargs):
-
+        self.int_data = []
         for pipe_rif in self.pipes:
             pipe_node = sim_nodes.get(pipe_rif[1:])
-            self.int_data.append(pipe_node.data)
+            self.int_data.append(pipe_node._data)
 
         self._data = self.int_data[-1]
 
+    def release_intermediate(self):
+        self.int_data = []
+
+    def release(self):
+        super().release()
+        self.int_data = []
+
+    def cache_key_items(self, **context):
+        items = super().cache_key_items(**context)
+        items['pipes'] = self.pipes
+        return items
+
 
 class ModuleNode(NodeCFG):
     """
     Class to represent a node ID in the GWM file.
     """
+    cacheable = False  # module data is bound to the simulation object (ie. flopy packages)
+    parallel_safe = False  # modules register themselves on the shared simulation object
+
     def __init__(self, **kwargs):
         super().__init__('module', **kwargs)
         self.template = {}
@@ -177,6 +227,10 @@ class ModuleNode(NodeCFG):
         if self.func is None:
             raise ValueError(f"Module function not found for {self.kind}")
         
+        # detach the previous build of this module (ie. flopy packages are registered on the model)
+        if self._data is not None and hasattr(self._data, 'remove'):
+            self._data.remove()
+
         # get the function from the template
         func = utils.get_function(self.func)
         self._data = func(**cmd_args)  # Set the internal _data attribute
@@ -208,6 +262,12 @@ class ModuleNode(NodeCFG):
                 arg_data[k] = v
         return arg_data
 
+    def cache_key_items(self, **context):
+        items = super().cache_key_items(**context)
+        items['func'] = self.func
+        items['args'] = self.args
+        return items
+
 
 class MeshNode(NodeCFG):
     """
@@ -221,6 +281,7 @@ class MeshNode(NodeCFG):
         super().__init__('mesh', **kwargs)
         self._param = param
         self._mesh = mesh #TODO: add mesh type
+        self._owner = None  # the Mesh an attribute node reads its data from
 
     @property
     def mesh(self):
@@ -242,6 +303,8 @@ class MeshNode(NodeCFG):
             else:
                 kwargs[k] = v
 
+        from rapid_gwm_build.mesh import Mesh
+
         self._mesh = Mesh(**kwargs)
 
     @property
@@ -272,11 +335,29 @@ class MeshNode(NodeCFG):
             self._data = self.mesh
         elif self.mesh.startswith("@"):
             mesh_node = sim_nodes.get(self._mesh[1:])
-            self._data = getattr(mesh_node.data, self.param)
+            self._owner = mesh_node.data
+            self._data = getattr(self._owner, self.param)
         else:
             self._set_mesh()
             self._data = self.mesh
 
+    def release(self):
+        super().release()
+        self._owner = None
+
+    def replace_data(self, old, new):
+        # an attribute node shares its array with the mesh, which must let go of it as well
+        super().replace_data(old, new)
+        owner = getattr(self, "_owner", None)
+        if owner is not None and getattr(owner, self.param, None) is old:
+            setattr(owner, self.param, new)
+
+    def cache_key_items(self, **context):
+        items = super().cache_key_items(**context)
+        items['param'] = self.param
+        items['mesh'] = self.mesh if isinstance(self.mesh, str) else None
+        return items
+
 
 
 
@@ -288,6 +369,7 @@ class InputNode(NodeCFG):
         super().__init__('input',  **kwargs)
         self.src_arg = src_arg #flag to specify if the input data is args
         self._input = None
+        self._source_stat = None  # (mtime, size) of the input file when it was last opened
 
     @property
     def input(self):
@@ -312,6 +394,49 @@ class InputNode(NodeCFG):
         Get the data for this node. This method should be overridden in subclasses.
         """
         self._data = self.input.open()
+        self.record_source_stat()
+
+    def record_source_stat(self):
+        """
+        Remember the stat of the input file behind the data (ie. also when loaded from the node cache).
+        """
+        if isinstance(self.input, FilepathInput):
+            self._source_stat = self._stat_source()
+
+    def _stat_source(self):
+        stat = os.stat(self.input.filepath)
+        return stat.st_mtime_ns, stat.st_size
+
+    def source_size(self):
+        """
+        Size in bytes of the input file (None if the input is not a file).
+        """
+        if not isinstance(self.input, FilepathInput):
+            return None
+        try:
+            return os.path.getsize(self.input.filepath)
+        except OSError:
+            return None
+
+    def is_modified(self) -> bool:
+        """
+        Check if the input file has changed since the node was last resolved.
+        """
+        if self._source_stat is None or not isinstance(self.input, FilepathInput):
+            return False
+        try:
+            return self._stat_source() != self._source_stat
+        except OSError:
+            return True
+
+    def cache_key_items(self, file_digest=None, **context):
+        items = super().cache_key_items(**context)
+        items['src_arg'] = self.src_arg
+        if isinstance(self.input, FilepathInput):
+            items['open_kwargs'] = self.input.open_kwargs
+            if file_digest is not None:
+                items['file'] = file_digest(self.input.filepath)
+        return items
 
 class TemplateNode(NodeCFG):
     """
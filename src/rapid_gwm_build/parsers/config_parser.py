@@ -1,16 +1,63 @@
 import os
 import re
 import hashlib
-import yaml
-from copy import deepcopy
+import logging
+import pickle
+from pathlib import Path
 
-from rapid_gwm_build.ss.node_builder import NodeBuilder
+from rapid_gwm_build.cache import default_cache_dir, hash_file
+from rapid_gwm_build.parsers.interpolation import Interpolator, interpolate
 from rapid_gwm_build.parsers.node_parser import NodeParser
+from rapid_gwm_build.parsers.yaml_processor import safe_load
+
+PARSED_VERSION = 2  # bump when the parsed config changes (invalidates cached configs)
+
+# strings which may be file paths (a directory separator or a file extension)
+PATH_LIKE = re.compile(r"[/\\]|\.\w{1,5}$")
+
+
+def _referenced_files(obj, found=None) -> dict:
+    """
+    Absolute path -> (size, mtime) of the files referenced by the string values of a config, or
+    None for path-like strings which are not files (inputs are classified on whether the file exists).
+    """
+    found = {} if found is None else found
+    if isinstance(obj, dict):
+        for value in obj.values():
+            _referenced_files(value, found)
+    elif isinstance(obj, list):
+        for value in obj:
+            _referenced_files(value, found)
+    elif isinstance(obj, str) and os.path.isfile(obj):
+        stat = os.stat(obj)
+        found[os.path.abspath(obj)] = (stat.st_size, stat.st_mtime_ns)
+    elif isinstance(obj, str) and not obj.startswith("@") and "\n" not in obj and PATH_LIKE.search(obj):
+        found[os.path.abspath(obj)] = None
+    return found
+
+
+def _unchanged(files: dict) -> bool:
+    for path, known in files.items():
+        if known is None:
+            if os.path.isfile(path):
+                return False  # a missing file has been created
+            continue
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if (stat.st_size, stat.st_mtime_ns) != tuple(known):
+            return False
+    return True
+
 
 class ConfigParser:
     # Regular expression to match variables like ${variable_name}
     VAR_PATTERN = re.compile(r"\$\{(\w+)\}")
 
+    disk_cache = True  # also keep parsed configs in <cache dir>/configs
+    _parsed = {}  # cache key -> {'files': referenced files, 'blob': pickled parsed config}
+
     @classmethod
     def load_yaml(cls, filepath):
         """Load a YAML file and return the parsed content."""
@@ -18,29 +65,19 @@ class ConfigParser:
             raise FileNotFoundError(f"Config file not found: {filepath}")
         
         with open(filepath, 'r') as file:
-            return yaml.safe_load(file)
+            return safe_load(file)
 
     @classmethod
     def substitute_config(cls, config):
-        return cls.recursive_substitute(config, config)
+        return interpolate(config)
     
     @staticmethod
     def resolve_placeholder(value, context):
         """
-        Resolve a single placeholder in the value string.
+        Resolve the placeholders (like ${key.subkey1.subkey2}) in the value string.
         """
         if isinstance(value, str):
-            # Match placeholders like ${key.subkey1.subkey2}
-            while "${" in value:
-                matches = re.findall(r"\$\{([a-zA-Z0-9_.]+)\}", value)
-                for match in matches:
-                    keys = match.split(".")
-                    resolved_value = context
-                    for key in keys:
-                        resolved_value = resolved_value.get(key, None)
-                        if resolved_value is None:
-                            raise KeyError(f"Key '{match}' not found in the configuration.")
-                    value = value.replace(f"${{{match}}}", str(resolved_value))
+            return Interpolator(context).interpolate(value)
         return value
 
     @classmethod
@@ -48,31 +85,12 @@ class ConfigParser:
         """
         Recursively substitute placeholders in the object.
         """
-        if isinstance(obj, dict):
-            return {key: cls.recursive_substitute(value, context) for key, value in obj.items()}
-        elif isinstance(obj, list):
-            return [cls.recursive_substitute(item, context) for item in obj]
-        else:
-            return cls.resolve_placeholder(obj, context)
-
-
+        return interpolate(obj, context)
 
     @classmethod
     def substitute_vars(cls, config):
         """Substitute variables in the config using the 'vars' block."""
-        vars_ = config.get("vars", {})
-        
-        def replace(value):
-            """Recursively replace variables in strings."""
-            if isinstance(value, str):
-                return cls.VAR_PATTERN.sub(lambda m: vars_.get(m.group(1), m.group(0)), value)
-            elif isinstance(value, dict):
-                return {k: replace(v) for k, v in value.items()}
-            elif isinstance(value, list):
-                return [replace(v) for v in value]
-            return value
-        
-        return replace(deepcopy(config))  # Deepcopy to avoid mutating the original config
+        return interpolate(config, config.get("vars", {}), pattern=cls.VAR_PATTERN, strict=False)
 
 
     @classmethod
@@ -87,14 +105,101 @@ class ConfigParser:
         return {n.id: n for n in node_manager.nodes}
     
     @classmethod
-    def parse(cls, config_filepath):
-        """Parse the user config and return a normalized structure."""
-        config = cls.load_yaml(config_filepath) # First, substitute variables (like ${data_dir})
-        config = cls.substitute_config(config)
+    def parse(cls, config_filepath, use_cache: bool = True):
+        """
+        Parse the user config and return a normalized structure.
+
+        Parsed configs are cached (in memory and on disk) on the content hash of the config file,
+        and are only reused while the files it references are unchanged (size and mtime).
+        Every call returns new copies of the nodes.
+        :param use_cache: Set to False to always load and parse the config file.
+        """
+        if not use_cache:
+            return cls.parse_config(cls.load_yaml(config_filepath))
+        if not os.path.exists(config_filepath):
+            raise FileNotFoundError(f"Config file not found: {config_filepath}")
+
+        key = cls._cache_key(config_filepath)
+        entry = cls._parsed.get(key) or cls._read_parsed(key)
+        if entry is not None and _unchanged(entry['files']):
+            cls._parsed[key] = entry
+            logging.debug(f"Parsed config {config_filepath} loaded from the cache.")
+            return pickle.loads(entry['blob'])
+
+        config = cls.substitute_config(cls.load_yaml(config_filepath))
+        files = _referenced_files(config)
+        parsed = cls._parse_substituted(config)
+        entry = {
+            'files': files,
+            'blob': pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL),
+        }
+        cls._parsed[key] = entry
+        cls._write_parsed(key, entry)
+        return parsed
+
+    @staticmethod
+    def _cache_key(config_filepath) -> str:
+        # relative paths in the config are relative to the working directory
+        return hashlib.sha256(
+            f"{hash_file(config_filepath)}:{os.getcwd()}:{PARSED_VERSION}".encode()
+        ).hexdigest()
+
+    @classmethod
+    def _parsed_path(cls, key: str) -> Path:
+        return default_cache_dir() / "configs" / f"{key}.pkl"
+
+    @classmethod
+    def _read_parsed(cls, key: str):
+        if not cls.disk_cache:
+            return None
+        path = cls._parsed_path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+            pickle.loads(entry['blob'])  # stale pickles (ie. moved classes) are parsed again
+            return entry
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.debug(f"Parsed config {path} could not be loaded: {e}")
+            return None
+
+    @classmethod
+    def _write_parsed(cls, key: str, entry: dict):
+        if not cls.disk_cache:
+            return
+        path = cls._parsed_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.debug(f"Parsed config could not be written to {path}: {e}")
+
+    @classmethod
+    def clear_cache(cls):
+        """Drop the in-memory parsed configs (the on-disk cache is validated on the file hashes)."""
+        cls._parsed.clear()
+
+    @classmethod
+    def parse_config(cls, config: dict, sim_names: list = None):
+        """
+        Parse a loaded user config (ie. a modified copy of a config file).
+        :param sim_names: Only parse these simulations (default: all).
+        """
+        config = cls.substitute_config(config) # First, substitute variables (like ${data_dir})
+        return cls._parse_substituted(config, sim_names)
+
+    @classmethod
+    def _parse_substituted(cls, config: dict, sim_names: list = None):
         all_sims = {}
 
         # Process each simulation block
         for sim_name, sim_cfg in config.get("simulations", {}).items():
+            if sim_names is not None and sim_name not in sim_names:
+                continue
             # Flatten modules and input nodes
             node_cfgs = cls._get_node_cfg(sim_cfg)
             all_sims[sim_name] = {
@@ -0,0 +1,84 @@
+import re
+
+# Placeholders like ${key.subkey1.subkey2}
+PLACEHOLDER = re.compile(r"\$\{([a-zA-Z0-9_.]+)\}")
+
+
+class Interpolator:
+    """
+    Substitutes placeholders in a (nested) config with values from a context in a single pass.
+
+    Every referenced key is looked up and interpolated once and memoized. Placeholders in the
+    referenced values are resolved recursively, and circular references raise a ValueError.
+    """
+    def __init__(self, context: dict, pattern: re.Pattern = PLACEHOLDER, strict: bool = True):
+        """
+        :param context: Values the placeholders refer to (dotted paths of nested dictionaries).
+        :param pattern: Placeholder regex, group 1 is the reference.
+        :param strict: Raise a KeyError for missing references (otherwise the placeholder is kept).
+        """
+        self.context = context
+        self.pattern = pattern
+        self.strict = strict
+        self._resolved = {}  # reference -> interpolated text
+        self._active = []  # references being resolved (cycle detection)
+
+    def lookup(self, ref: str):
+        """
+        Returns the interpolated text of a reference (None if it is missing and not strict).
+        """
+        text = self._resolved.get(ref)
+        if text is not None:
+            return text
+        if ref in self._active:
+            chain = self._active[self._active.index(ref):] + [ref]
+            raise ValueError(f"Circular reference in the configuration: {' -> '.join(chain)}")
+
+        value = self.context
+        for key in ref.split("."):
+            value = value.get(key, None) if isinstance(value, dict) else None
+            if value is None:
+                if self.strict:
+                    raise KeyError(f"Key '{ref}' not found in the configuration.")
+                return None
+
+        self._active.append(ref)
+        try:
+            text = self.interpolate(str(value))
+        finally:
+            self._active.pop()
+        self._resolved[ref] = text
+        return text
+
+    def _replace(self, match) -> str:
+        text = self.lookup(match.group(1))
+        return match.group(0) if text is None else text
+
+    def interpolate(self, value: str) -> str:
+        """
+        Substitute the placeholders in a string.
+        """
+        if "${" not in value:
+            return value
+        return self.pattern.sub(self._replace, value)
+
+    def substitute(self, obj):
+        """
+        Substitute the placeholders in every string of a nested config. Dictionaries and lists are
+        copied (the parsers modify them), other values are shared with obj.
+        """
+        if isinstance(obj, dict):
+            return {key: self.substitute(value) for key, value in obj.items()}
+        elif isinstance(obj, list):
+            return [self.substitute(item) for item in obj]
+        elif isinstance(obj, str):
+            return self.interpolate(obj)
+        return obj
+
+
+def interpolate(obj, context: dict = None, **kwargs):
+    """
+    Substitute the placeholders of a nested config (by default with values from the config itself).
+    :param kwargs: Passed to `Interpolator`.
+    """
+    return Interpolator(obj if context is None else context, **kwargs).substitute(obj)
@@ -1,9 +1,16 @@
-from cerberus import Validator
 import yaml
 import logging
 
 from rapid_gwm_build.templates.template_schema import top_level_schema
 
+# libyaml C loader (an order of magnitude faster on large files) if pyyaml was built with it
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def safe_load(stream):
+    """Same as yaml.safe_load, with the libyaml loader when it is available."""
+    return yaml.load(stream, Loader=YamlLoader)
+
 
 class YamlProcessor:
     def __init__(
@@ -11,7 +18,16 @@ class YamlProcessor:
         schema: dict,
     ):
         self.schema = schema
-        self.validator = Validator(self.schema)
+        self._validator = None
+
+    @property
+    def validator(self):
+        # cerberus is only imported when a template is validated (compiled templates are cached)
+        if self._validator is None:
+            from cerberus import Validator
+
+            self._validator = Validator(self.schema)
+        return self._validator
 
     def validate(self, template: dict) -> bool:
         return self.validator.validate(template)
@@ -21,7 +37,7 @@ class YamlProcessor:
 
     def load_and_validate(self, yaml_path: str) -> dict:
         with open(yaml_path, "r") as f:
-            template = yaml.safe_load(f)
+            template = safe_load(f)
 
         if not self.validate(template):
             logging.error(f"Template validation failed: {self.get_errors()}")
@@ -40,3 +40,49 @@ def to_mf6_txt(data: DataFrame, map=None, cols=None, outdir=None, node_id=None,
         outs = data
 
     return outs
+
+
+def netcdf_to_periods(data, variable=None, mesh=None, periods=None, scale=1.0, fill=0.0,
+                      xorigin=0.0, yorigin=0.0, delr=None, delc=None, nrow=None, ncol=None, resolution=None,
+                      fmt="%.6e", outdir=None, node_id=None, **kwargs):
+    """
+    Write a variable of a NetCDF input (ie. recharge or climate forcing) as one MF6 array file per
+    stress period. Only one period of the model window is in memory at a time.
+    :param data: NetCDFHandle (a NetCDF input).
+    :param variable: Name of the variable.
+    :param mesh: Mesh (ie. '@mesh') of the grid, or its geometry from xorigin, yorigin, delr/delc
+        (or nrow, ncol and resolution).
+    :param periods: Time step of each stress period: a list (kper = position) or a dict {kper: step}.
+        A step can be [start, stop] for the mean over the time steps. Default: one period per time step.
+    :param scale: Factor applied to the values (ie. a unit conversion).
+    :param fill: Value of the cells outside the data.
+    :return: {kper: {'filename': path}}
+    """
+    import os
+    import numpy as np
+
+    logging.debug("@ the netcdf_to_periods function")
+
+    pkg = node_id.split('.')[1] if node_id else None
+    if mesh is not None:
+        xorigin, yorigin, delr, delc = mesh.xorigin, mesh.yorigin, mesh.delr, mesh.delc
+    else:
+        delr = np.broadcast_to(np.asarray(delr if delr is not None else resolution, dtype=float), (ncol,))
+        delc = np.broadcast_to(np.asarray(delc if delc is not None else resolution, dtype=float), (nrow,))
+
+    if periods is None:
+        periods = range(data.ntime)
+    if not isinstance(periods, dict):
+        periods = dict(enumerate(periods))
+
+    window = data.window(xorigin, yorigin, delr, delc)
+    outs = {}
+    for kper, step in periods.items():
+        t = slice(*step) if isinstance(step, (list, tuple)) else int(step)
+        values = data.read_step(variable, t, xorigin, yorigin, delr, delc, window=window) * scale
+        values[np.isnan(values)] = fill
+        fname = f"{pkg}_{variable}_{kper}.txt"
+        out_path = fname if outdir is None else os.path.join(outdir, fname)
+        np.savetxt(out_path, values, fmt=fmt)
+        outs[int(kper)] = {'filename': out_path}
+    return outs
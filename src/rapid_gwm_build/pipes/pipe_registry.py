@@ -2,33 +2,138 @@ from typing import Callable, Dict
 import importlib
 import inspect
 import logging
+import threading
+
+ENTRY_POINT_GROUP = "rapid_gwm_build.pipes"  # entry points of pipe plugins (name = "module:function")
+
+# builtin pipes, imported when a pipe node first uses one of them
+BUILTIN_PIPES = {
+    "read_data": "rapid_gwm_build.pipes.builtin_pipes:read_data",
+    "to_mf6_txt": "rapid_gwm_build.pipes.builtin_pipes:to_mf6_txt",
+    "netcdf_to_periods": "rapid_gwm_build.pipes.builtin_pipes:netcdf_to_periods",
+}
+
+
+def _import_target(target: str) -> Callable:
+    """
+    Import a "module:function" (or "module:Class.method") target.
+    """
+    module_name, sep, attr_path = target.partition(":")
+    if not sep or not attr_path:
+        raise ValueError(f"Invalid pipe target '{target}'. Expected 'module:function'.")
+    try:
+        obj = importlib.import_module(module_name)
+    except ModuleNotFoundError as e:
+        raise ImportError(f"Module '{module_name}' of pipe '{target}' not found: {e}") from e
+    for attr in attr_path.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
 
 class PipeFactory:
     """
     A factory to register and retrieve functions (pipes) by name.
+
+    Pipes can be registered as functions, or declared as "module:function" targets (a manifest or
+    package entry points in the 'rapid_gwm_build.pipes' group) which are only imported when a
+    pipe node first asks for them. Resolved functions and their signatures are cached.
     """
     def __init__(self):
         self._registry: Dict[str, Callable] = {}
+        self._manifest: Dict[str, str] = {}  # name -> "module:function", imported on first use
+        self._signatures: Dict[str, inspect.Signature] = {}
+        self._pending: list = []  # modules registered with load_lazy, imported on the first lookup
+        self._entry_points_loaded = False
+        self._lock = threading.RLock()  # pipes are resolved by the build worker threads
 
-    def register(self, name: str, func: Callable):
+    def register(self, name: str, func):
         """
-        Register a function with a given name.
+        Register a function (or a "module:function" target) with a given name.
         """
+        if isinstance(func, str):
+            self._manifest[name] = func
+            self._registry.pop(name, None)
+            self._signatures.pop(name, None)
+            return
         if not callable(func):
             raise ValueError(f"The provided function for '{name}' is not callable.")
         self._registry[name] = func
+        self._signatures.pop(name, None)
+
+    def register_manifest(self, manifest):
+        """
+        Declare pipes without importing them.
+        :param manifest: Dictionary of name -> "module:function", or the path to a YAML file with one.
+        """
+        if not isinstance(manifest, dict):
+            from rapid_gwm_build.parsers.yaml_processor import safe_load
 
+            with open(manifest, "r") as f:
+                manifest = safe_load(f) or {}
+        for name, target in manifest.items():
+            self.register(name, target)
 
     def get(self, name: str) -> Callable:
         """
-        Retrieve a registered function by name. If not found, return the default function.
+        Retrieve a registered function by name, importing its module if needed.
+        """
+        func = self._registry.get(name)
+        if func is not None:
+            return func
+
+        with self._lock:
+            if name not in self._registry and name not in self._manifest:
+                self._load_entry_points()
+            if name not in self._registry and name not in self._manifest:
+                self._load_pending()
+            if name in self._registry:
+                return self._registry[name]
+            if name not in self._manifest:
+                raise KeyError(f"No function registered with name '{name}', and no default function is set.")
+
+            func = _import_target(self._manifest[name])
+            if not callable(func):
+                raise ValueError(f"Pipe '{name}' ({self._manifest[name]}) is not callable.")
+            self._registry[name] = func
+            logging.debug(f"Pipe {name} loaded from {self._manifest[name]}.")
+            return func
+
+    def signature(self, name: str) -> inspect.Signature:
+        """
+        Returns the (cached) signature of a pipe.
         """
-        if name in self._registry:
-            return self._registry[name]
-        else:
-            raise KeyError(f"No function registered with name '{name}', and no default function is set.")
-        
-    
+        sig = self._signatures.get(name)
+        if sig is None:
+            sig = inspect.signature(self.get(name))
+            self._signatures[name] = sig
+        return sig
+
+    def accepts(self, name: str, kwarg: str) -> bool:
+        """
+        Returns True if the pipe takes the keyword argument (or **kwargs).
+        """
+        params = self.signature(name).parameters
+        return kwarg in params or any(p.kind == inspect.Parameter.VAR_KEYWORD for p in params.values())
+
+    def names(self) -> list:
+        """
+        Names of the registered and declared pipes (nothing is imported).
+        """
+        with self._lock:
+            self._load_entry_points()
+            return sorted(set(self._registry) | set(self._manifest))
+
+    def _load_entry_points(self):
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        from importlib.metadata import entry_points
+
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            # pipes registered in this process take precedence over installed plugins
+            if ep.name not in self._registry and ep.name not in self._manifest:
+                self._manifest[ep.name] = ep.value
+
     def load_all_from_module(self, module_name=None):
         """
         Load and register all functions from a specified module.
@@ -45,10 +150,21 @@ class PipeFactory:
         except Exception as e:
             raise RuntimeError(f"Failed to load functions from module '{module_name}': {e}")
 
+    def load_lazy(self, module_name: str):
+        """
+        Register all functions from a module the first time an unknown pipe is looked up, so the
+        module (and its dependencies, ie. pandas) is not imported with the package.
+        """
+        self._pending.append(module_name)
+
+    def _load_pending(self):
+        while self._pending:
+            self.load_all_from_module(self._pending.pop(0))
+
 
 # Example usage
 pipe_registry = PipeFactory()
-pipe_registry.load_all_from_module("rapid_gwm_build.pipes.builtin_pipes")
+pipe_registry.register_manifest(BUILTIN_PIPES)
 
 
 
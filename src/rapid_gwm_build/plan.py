@@ -0,0 +1,88 @@
+from dataclasses import dataclass, asdict
+
+from rapid_gwm_build.trace import longest_path
+
+
+@dataclass
+class PlanStep:
+    """A node which `Simulation.build` would resolve."""
+    node_id: str
+    type: str
+    status: str  # 'cached' (loaded from the node cache), 'dirty' (built before, recomputed) or 'new' (never built)
+    est_cost: float = None  # estimated seconds, None if unknown
+    input_size: int = None  # bytes of the input file (input nodes only)
+
+
+class BuildPlan:
+    """
+    The ordered nodes a build would resolve, with cost estimates. Returned by `Simulation.plan`.
+    """
+    def __init__(self, steps: list, graph):
+        """
+        :param steps: PlanSteps in the order they would be resolved.
+        :param graph: The graph which would be built.
+        """
+        self.steps = steps
+        self.graph = graph.subgraph([step.node_id for step in steps])
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def by_status(self, status: str) -> list:
+        """Node IDs with the given status ('cached', 'dirty' or 'new')."""
+        return [step.node_id for step in self.steps if step.status == status]
+
+    def critical_path(self) -> tuple:
+        """
+        The chain of dependent nodes with the largest estimated cost.
+        :return: (list of node IDs, estimated seconds)
+        """
+        return longest_path(self.graph, {step.node_id: step.est_cost or 0.0 for step in self.steps})
+
+    def max_concurrency(self) -> int:
+        """
+        The largest number of nodes which could be resolved at the same time (useful for sizing `max_workers`).
+        """
+        import networkx as nx
+
+        return max((len(generation) for generation in nx.topological_generations(self.graph)), default=0)
+
+    def summary(self) -> dict:
+        """
+        Node counts per status and the estimated serial and critical path time.
+        """
+        path, path_cost = self.critical_path()
+        counts = {status: len(self.by_status(status)) for status in ("cached", "dirty", "new")}
+        return {
+            "nodes": len(self.steps),
+            **counts,
+            "unknown_cost": sum(1 for step in self.steps if step.est_cost is None),
+            "est_total": sum(step.est_cost or 0.0 for step in self.steps),
+            "est_critical_path": path_cost,
+            "critical_path": path,
+            "input_size": sum(step.input_size or 0 for step in self.steps),
+            "max_concurrency": self.max_concurrency(),
+        }
+
+    def report(self) -> list:
+        """Structured report of all steps."""
+        return [asdict(step) for step in self.steps]
+
+    def __str__(self):
+        lines = [f"{'node':<50}{'type':<10}{'status':<8}{'est (s)':>10}{'input (B)':>12}"]
+        for step in self.steps:
+            cost = "?" if step.est_cost is None else f"{step.est_cost:.3f}"
+            size = "" if step.input_size is None else str(step.input_size)
+            lines.append(f"{step.node_id:<50}{step.type:<10}{step.status:<8}{cost:>10}{size:>12}")
+        summary = self.summary()
+        lines.append(
+            f"{summary['nodes']} nodes ({summary['cached']} cached, {summary['dirty']} dirty, {summary['new']} new), "
+            f"est. {summary['est_total']:.3f}s serial, {summary['est_critical_path']:.3f}s critical path"
+        )
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"BuildPlan({len(self.steps)} nodes)"
@@ -0,0 +1,75 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable
+
+
+class NodeBuildError(RuntimeError):
+    """
+    Raised when a node fails to resolve during a scheduled build.
+    """
+    def __init__(self, node_id: str, error: Exception):
+        self.node_id = node_id
+        self.error = error
+        super().__init__(f"Node {node_id} failed to resolve: {error!r}")
+
+
+class BuildScheduler:
+    """
+    Runs the nodes of a graph on a thread pool as soon as all of their upstream nodes are done.
+
+    Ready nodes are always submitted in the order of `node_ids` (ie. a topological sort), so the
+    result of a build does not depend on the number of workers. Nodes which are not
+    `parallel_safe` (ie. flopy modules which register themselves on a shared simulation object)
+    are run one at a time, in the order of `node_ids`.
+    """
+    def __init__(self, graph, max_workers: int = None):
+        self.graph = graph
+        self.max_workers = max_workers
+
+    def run(self, node_ids: list, func: Callable, parallel_safe: Callable = None):
+        """
+        Call `func(node_id)` for each node in `node_ids` respecting the edges of the graph.
+        :param node_ids: The node IDs to run, in topological order.
+        :param func: The function to run for each node.
+        :param parallel_safe: Optional function returning False for nodes which must not run concurrently.
+        :raises NodeBuildError: If any node fails. Pending nodes are cancelled.
+        """
+        order = {n_id: i for i, n_id in enumerate(node_ids)}
+        waiting_on = {n_id: {p for p in self.graph.predecessors(n_id) if p in order} for n_id in node_ids}
+
+        # each serial node also waits for the previous serial node (the order of node_ids)
+        next_serial = {}
+        if parallel_safe is not None:
+            serial = [n_id for n_id in node_ids if not parallel_safe(n_id)]
+            for previous, n_id in zip(serial, serial[1:]):
+                waiting_on[n_id].add(previous)
+                next_serial[previous] = n_id
+        ready = sorted((n_id for n_id, deps in waiting_on.items() if not deps), key=order.get)
+
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while ready or running:
+                for n_id in ready:
+                    running[executor.submit(func, n_id)] = n_id
+                ready = []
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: order[running[f]]):
+                    n_id = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        for pending in running:
+                            pending.cancel()
+                        raise NodeBuildError(n_id, error) from error
+
+                    successors = list(self.graph.successors(n_id))
+                    if n_id in next_serial:
+                        successors.append(next_serial[n_id])
+                    for succ in successors:
+                        if succ in waiting_on and n_id in waiting_on[succ]:
+                            waiting_on[succ].discard(n_id)
+                            if not waiting_on[succ]:
+                                ready.append(succ)
+                ready.sort(key=order.get)
+
+        logging.debug(f"Scheduled {len(node_ids)} nodes on {self.max_workers} workers.")
@@ -1,15 +1,19 @@
 # import pathlike
 from os import PathLike
 from pathlib import Path
-import networkx as nx
 import logging
+import time
 
+from rapid_gwm_build.cache import NodeCache, DEFAULT_MAX_SIZE
+from rapid_gwm_build.io.object_store import ObjectStore
+from rapid_gwm_build.memory import ReleaseTracker, SpillManager
 from rapid_gwm_build.network_registry import NetworkRegistry
+from rapid_gwm_build.plan import BuildPlan, PlanStep
+from rapid_gwm_build.scheduler import BuildScheduler, NodeBuildError
+from rapid_gwm_build.trace import BuildTrace
 # from rapid_gwm_build.ss.node_builder import NodeBuilder
 from rapid_gwm_build.nodes.node_base import NodeCFG
 from rapid_gwm_build.nodes.node_cfg import NodeFactory
-from rapid_gwm_build.parsers.config_parser import ConfigParser
-from rapid_gwm_build import utils
 # from rapid_gwm_build.module_builder import ModuleBuilder
 # from rapid_gwm_build.mesh import Mesh
 
@@ -22,17 +26,27 @@ class Simulation:
         sim_type: str = "generic",  # type of the simulation (ie. modflow, mt3d, etc)
         ref_dir: str | PathLike = None,  # output directory for the simulation
         derived_dir: str | PathLike = None,  # output directory for the simulation
+        cache_dir: str | PathLike = None,  # directory for the node cache (no caching if None)
+        cache_size: int = DEFAULT_MAX_SIZE,  # max size of the node cache in bytes
+        memory_budget: int = None,  # bytes of array data to hold in memory before spilling to disk
         # cfg: dict = None,  # config file for the simulation (ie. yaml file)
         # _defaults: str = None,  # defaults for the simulation (ie. yaml file)
         # # TODO: add path to model executables
     ):
         self.name = name
         self.cfg = cfg
+        self.cfg_filepath = None  # config file the simulation was created from (if any)
         
         self.ref_dir = ref_dir if isinstance(ref_dir, Path) else Path(ref_dir)
         self.derived_dir = derived_dir if isinstance(derived_dir, Path) else Path(derived_dir)
         
         self.sim_type = self.cfg.get("sim_type", sim_type)  # type of the simulation (ie. modflow, mt3d, etc)
+
+        self.cache = NodeCache(cache_dir, max_size=cache_size) if cache_dir is not None else None
+        self.trace = BuildTrace()  # timeline of the last build (and write)
+        self.timings = {}  # seconds per phase when created with create_simulations
+        self.written_files = []  # workspace files written by the last write (relative paths)
+        self.spill = SpillManager(self.derived_dir / 'spill', budget=memory_budget) if memory_budget is not None else None
         
         self.graph = NetworkRegistry()
         self.edges = self.graph._graph.edges
@@ -44,43 +58,56 @@ class Simulation:
 
     @property
     def nodes(self):
-        return {n_id: data['node'] for n_id, data in self.graph._graph.nodes.data()}
+        return self.graph.nodes
     
     def set_template(self, sim_type: str):
         from rapid_gwm_build.templates.template_loader import TemplateLoader
-        self.template = TemplateLoader.load_template(sim_type)
-        config, template_nodes = ConfigParser.parse_template(self.template)
-        # update template with config
-        self.template.update(config)
+        # validated template with the template nodes already parsed (cached)
+        self.template, template_nodes = TemplateLoader.load_compiled(sim_type)
         for ncfg in template_nodes.values():
             self._new_node(ncfg=ncfg)
         print('here')
 
     
     @classmethod
-    def from_config(cls, name, sim_cfg, ref_dir=None, derived_dir=None):
+    def from_config(cls, name, sim_cfg, ref_dir=None, derived_dir=None, **kwargs):
         sim = cls(
             name=name,
             cfg=sim_cfg,
             ref_dir=ref_dir,
             derived_dir=derived_dir,
+            **kwargs,
         )
 
         for ncfg in sim_cfg['nodes'].values():
             sim._new_node(ncfg=ncfg)
         return sim
     
-    def _check_nodeid_in_sim(self, node_id: str):
-        if node_id not in self.nodes.keys() and node_id not in self.cfg['nodes'].keys():
-            return False
+    def save_snapshot(self, path, cfg_filepath=None):
+        """
+        Save the graph, node configs and resolved node data so the simulation can be restored with
+        `Simulation.load_snapshot` without parsing and building again. Arrays are stored as .npy files.
+        """
+        from rapid_gwm_build.snapshot import save_snapshot
+        return save_snapshot(self, path, cfg_filepath=cfg_filepath)
 
-        # check existing node IDs
-        node_list = [node_id for node_id in self.nodes.keys()]
-        match_nodeid = utils.match_nodeid(node_id, node_list) #TODO more advanced matching method
+    @classmethod
+    def load_snapshot(cls, path, cfg_filepath=None, mmap_mode: str = "c"):
+        """
+        Restore a simulation saved with `save_snapshot` (arrays are memory-mapped). Module nodes are
+        marked dirty: call `build(mode='dirty')` to rebuild them.
+        :param cfg_filepath: Raise a ValueError if this config file changed since the snapshot was saved.
+        """
+        from rapid_gwm_build.snapshot import load_snapshot
+        return load_snapshot(path, cfg_filepath=cfg_filepath, mmap_mode=mmap_mode)
 
-        if not match_nodeid:
+    def _check_nodeid_in_sim(self, node_id: str):
+        if node_id in self.graph:
+            return True
+        elif node_id in self.cfg['nodes']:
             self._new_node(node_id=node_id)
-        return True
+            return True
+        return False
 
     
     def _resolve_references(self, node):
@@ -135,7 +162,7 @@ class Simulation:
 
 
     def _node_from_cfg(self, ncfg):
-        if ncfg.id in [n_id for n_id in self.nodes.keys()]:
+        if ncfg.id in self.graph:
             pass
         else:
             if ncfg.type == 'module':
@@ -172,17 +199,246 @@ class Simulation:
         return dict(items)
 
     
-    def build(self, mode="all"): #TODO move to GraphClass
+    def build(self, mode="all", max_workers: int = None, targets: list = None, release_data: bool = False): #TODO move to GraphClass
+        """
+        Resolve the nodes upstream of the module nodes.
+        :param mode: 'all' resolves every node, 'dirty' only resolves nodes which have been
+            invalidated (or never resolved) since the last build.
+        :param max_workers: Resolve independent nodes concurrently on this many threads.
+        :param targets: Only resolve these nodes (ie. ['module.dis']) and their upstream nodes.
+        :param release_data: Memory-lean build. Drop the data of each node once all of its downstream
+            nodes are resolved (module nodes and targets are kept).
+        """
+        subgraph, order, to_resolve = self._build_order(mode, targets)
+        self.trace = BuildTrace()
+        fingerprints = {}
 
-        for nodeid in nx.topological_sort(self.graph.subgraph): #TODO don't resolve nodes which are not needed
-            node = self.nodes[nodeid]
-            if node.type != 'placeholder':
-                node.resolve(sim_nodes=self.nodes, ref_dir=self.ref_dir, derived_dir=self.derived_dir)
-                logging.debug(f"Node {node.id} resolved successfully.")
+        tracker = None
+        if release_data:
+            keep = set(self.graph.list_type('module')) | set(targets or [])
+            tracker = ReleaseTracker(subgraph, order, self.nodes, keep=keep)
+
+        def build_node(nodeid):
+            self._build_node(self.nodes[nodeid], nodeid in to_resolve, fingerprints)
+            if tracker is not None:
+                tracker.done(nodeid)
+
+        if max_workers is not None and max_workers > 1:
+            scheduler = BuildScheduler(subgraph, max_workers=max_workers)
+            scheduler.run(order, build_node, parallel_safe=lambda nodeid: self.nodes[nodeid].parallel_safe)
+        else:
+            for nodeid in order:
+                try:
+                    build_node(nodeid)
+                except Exception as e:
+                    raise NodeBuildError(nodeid, e) from e
+
+        if self.cache is not None:
+            self.cache.flush()
+            logging.debug(f"Node cache: {self.cache.stats()}")
+        if tracker is not None:
+            logging.debug(f"Released the data of {len(tracker.released)} nodes.")
         logging.debug(f"Simulation {self.name} built successfully.")
 
+    def _build_order(self, mode: str, targets: list = None) -> tuple:
+        """
+        The graph to build, its topological order and the set of node IDs to resolve.
+        """
+        import networkx as nx
+
+        if mode not in ("all", "dirty"):
+            raise ValueError(f"Invalid build mode '{mode}'. Expected 'all' or 'dirty'.")
+
+        if targets:
+            subgraph = self.graph._graph.subgraph(self.graph.ancestors(targets))
+        else:
+            subgraph = self.graph.subgraph
+        order = list(nx.topological_sort(subgraph))
+        to_resolve = self._dirty_closure(subgraph, order) if mode == "dirty" else set(order)
+        return subgraph, order, to_resolve
+
+    def plan(self, mode="all", targets: list = None) -> BuildPlan:
+        """
+        Dry run of `build`: the nodes which would be resolved, in order, without resolving anything.
+        Each node is marked as 'cached', 'dirty' or 'new' with a cost estimate from the last build
+        (`self.trace`), the node cache timings or the size of its input file.
+        :param mode: See `build`.
+        :param targets: See `build`.
+        """
+        subgraph, order, to_resolve = self._build_order(mode, targets)
+        last = self.trace.nodes()
+        timings = self.cache.timings() if self.cache is not None else {}
+        throughput = self._read_throughput(last.values())
+
+        fingerprints = {}
+        steps = []
+        for nodeid in order:
+            node = self.nodes[nodeid]
+            cached = False
+            if self.cache is not None:
+                fingerprints[nodeid] = self._fingerprint(node, fingerprints)
+                cached = node.cacheable and fingerprints[nodeid] in self.cache
+            if nodeid not in to_resolve or node.type == 'placeholder':
+                continue
+
+            if cached:
+                status = 'cached'
+            elif node._data is None and not node.released:
+                status = 'new'
+            else:
+                status = 'dirty'
+
+            input_size = node.source_size() if node.type == 'input' else None
+            event = last.get(nodeid)
+            if cached:
+                est_cost = event.wall if event is not None and event.cached else 0.0
+            elif event is not None and not event.cached:
+                est_cost = event.wall
+            elif nodeid in timings:
+                est_cost = timings[nodeid]
+            elif input_size is not None and throughput:
+                est_cost = input_size / throughput
+            else:
+                est_cost = None
+            steps.append(PlanStep(nodeid, node.type, status, est_cost=est_cost, input_size=input_size))
+
+        if self.cache is not None:
+            self.cache.flush()  # keep the input file hashes
+        return BuildPlan(steps, subgraph)
+
+    @staticmethod
+    def _read_throughput(events) -> float:
+        """
+        Bytes per second read by the input nodes of a previous build (None if unknown).
+        """
+        nbytes = wall = 0
+        for event in events:
+            if event.cat == 'input' and event.bytes_read and not event.cached:
+                nbytes += event.bytes_read
+                wall += event.wall
+        return nbytes / wall if wall > 0 else None
+
+    def _dirty_closure(self, subgraph, order: list) -> set:
+        """
+        The dirty nodes plus any released upstream nodes which they need to read from.
+        """
+        to_resolve = {nodeid for nodeid in order if self.nodes[nodeid].dirty}
+        stack = list(to_resolve)
+        while stack:
+            for dep_id in subgraph.predecessors(stack.pop()):
+                if dep_id not in to_resolve and self.nodes[dep_id].released:
+                    to_resolve.add(dep_id)
+                    stack.append(dep_id)
+        return to_resolve
+
+    def _build_node(self, node, resolve: bool, fingerprints: dict):
+        if not resolve:
+            if self.cache is not None:
+                fingerprints[node.id] = self._fingerprint(node, fingerprints)
+            return
+
+        if node.type != 'placeholder':
+            with self.trace.measure(node) as event:
+                event.cached = self._resolve_node(node, fingerprints)
+            if self.spill is not None:
+                self.spill.track(node, self.nodes)
+        elif self.cache is not None:
+            fingerprints[node.id] = self._fingerprint(node, fingerprints)
+        node.mark_clean()
+
+    def invalidate(self, node_id: str):
+        """
+        Mark a node and all of its downstream nodes as dirty so they are resolved by `build(mode='dirty')`.
+        """
+        invalidated = self.graph.invalidate(node_id)
+        logging.debug(f"Invalidated {len(invalidated)} nodes downstream of {node_id}.")
+        return invalidated
+
+    def invalidate_modified(self):
+        """
+        Invalidate all input nodes whose input file has changed since it was last read.
+        """
+        modified = [n_id for n_id in self.graph.list_type('input') if self.nodes[n_id].is_modified()]
+        for n_id in modified:
+            self.invalidate(n_id)
+        return modified
+
+    def rebuild(self):
+        """
+        Invalidate any modified inputs and resolve only the dirty nodes.
+        """
+        self.invalidate_modified()
+        self.build(mode="dirty")
+
+    def _fingerprint(self, node, fingerprints: dict) -> str:
+        upstream = [fingerprints.get(dep_id) for dep_id in sorted(self.graph._graph.predecessors(node.id))]
+        return self.cache.fingerprint(node, upstream, derived_dir=str(self.derived_dir))
+
+    def _resolve_node(self, node, fingerprints: dict) -> bool:
+        """
+        Resolve a single node, loading it from the node cache if an entry exists for its fingerprint.
+        Returns True if the data was loaded from the cache.
+        """
+        key = None
+        if self.cache is not None:
+            key = self._fingerprint(node, fingerprints)
+            fingerprints[node.id] = key
+            if node.cacheable:
+                hit, data = self.cache.get(key)
+                if hit and node.cache_hit_valid(data):
+                    node._data = data
+                    if node.type == 'input':
+                        node.record_source_stat()  # so is_modified detects later edits
+                    logging.debug(f"Node {node.id} loaded from cache.")
+                    return True
+
+        start = time.perf_counter()
+        node.resolve(sim_nodes=self.nodes, ref_dir=self.ref_dir, derived_dir=self.derived_dir)
+        logging.debug(f"Node {node.id} resolved successfully.")
+
+        if key is not None and node.cacheable:
+            self.cache.put(key, node._data, node_id=node.id, elapsed=time.perf_counter() - start)
+        return False
+
     
-    def write(self):
+    def write(self, packages: list = None, dedup=None):
+        """
+        Write the simulation files.
+        :param packages: Only write these modules (ie. ['dis', 'wel'] or ['module.dis']) using the
+            template 'write_module' instructions.
+        :param dedup: Hard link the written files to a content-addressed ObjectStore so identical files
+            across workspaces are stored once. True (store in derived_dir/objects), a store directory
+            or an ObjectStore. Other workspace files (ie. outputs of previous runs) are not linked.
+        """
+        ws = Path(self.cfg['ws'])
+        if ws.exists() and ObjectStore.has_links(ws):
+            ObjectStore.detach(ws)  # files are rewritten in place
+        before = ObjectStore.snapshot(ws) if ws.exists() else {}
+
+        if packages:
+            self._write_modules(packages)
+        else:
+            self._write_all()
+
+        # the model input files, not the outputs of previous runs
+        self.written_files = ObjectStore.changed_files(ws, before) if ws.exists() else []
+
+        store = self._object_store(dedup)
+        if store is not None:
+            with self.trace.span("write.dedup", "write"):
+                store.dedup(ws, files=self.written_files)
+
+    def _object_store(self, dedup):
+        if dedup is None or dedup is False:
+            return None
+        elif isinstance(dedup, ObjectStore):
+            return dedup
+        elif dedup is True:
+            return ObjectStore(self.derived_dir / 'objects')
+        return ObjectStore(dedup)
+
+    def _write_all(self):
+
         ins = self.template['write']
 
         for i, call_dict in ins.items():
@@ -193,16 +449,35 @@ class Simulation:
             for i in func:
                 # resolve the references in the input dictionary
                 if i.startswith("@"):
-                    node_id = i[1:]
-                    node_list = [i for i in self.nodes.keys()]
-                    ref_id = utils.match_nodeid(node_id, node_list)
-                    
+                    ref_id = self.graph.find(i)
                     ref_node = self.nodes.get(ref_id)
                     ref_func.append(ref_node.data)
                 else:
                     ref_func.append(i)
             
             func = getattr(ref_func[0], ref_func[1])
-            func(**(args or {}))
+            with self.trace.span(f"write.{ref_func[1]}", "write"):
+                func(**(args or {}))
+
+    def _write_modules(self, packages: list):
+        ins = self.template.get('write_module', None)
+        if not ins:
+            raise NotImplementedError(f"Template for {self.sim_type} does not support writing single modules.")
+
+        for required in ins.get('requires', []):
+            node = self.nodes.get(required)
+            if node is not None and node._data is None:
+                raise ValueError(f"Module {required} is needed to write single modules. Call 'build(targets=[...])' with it first.")
 
+        for package in packages:
+            node_id = package if package.startswith("module.") else f"module.{package}"
+            node = self.nodes.get(self.graph.find(node_id))
+            if node is None:
+                raise KeyError(f"Module {node_id} does not exist in simulation {self.name}.")
+            if node._data is None:
+                raise ValueError(f"Module {node_id} has not been built. Call 'build(targets=[...])' first.")
 
+            func = getattr(node.data, ins['func'])
+            with self.trace.span(f"write.{node_id}", "write"):
+                func(**(ins.get('args', None) or {}))
+            logging.debug(f"Module {node_id} written.")
@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import pickle
+import shutil
+import time
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+
+from rapid_gwm_build.cache import NodeCache, hash_file
+from rapid_gwm_build.memory import SpillManager
+from rapid_gwm_build.trace import BuildTrace
+
+SNAPSHOT_VERSION = 1
+MIN_ARRAY_SIZE = 64 * 1024  # smaller arrays are pickled inline
+
+# primitive values can be interned (shared by unrelated nodes), they are always pickled
+_PRIMITIVES = (str, bytes, int, float, bool, tuple, type(None))
+
+
+def config_hash(cfg_filepath) -> str:
+    """
+    Returns the content hash of a config file.
+    """
+    return hash_file(cfg_filepath)
+
+
+def read_manifest(path) -> dict:
+    with open(Path(path) / "manifest.json", "r") as f:
+        return json.load(f)
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """
+    Pickles arrays to .npy files (so they can be memory-mapped on load) and drops objects which
+    are rebuilt after loading (ie. module data bound to the simulation object).
+    """
+    def __init__(self, file, array_dir: Path, skip: set):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.array_dir = array_dir
+        self.skip = skip
+        self.arrays = {}  # id(array) -> file name (arrays shared by several nodes are saved once)
+
+    def persistent_id(self, obj):
+        if id(obj) in self.skip:
+            return ("skip",)
+        if isinstance(obj, np.ndarray) and not obj.dtype.hasobject and obj.nbytes >= MIN_ARRAY_SIZE:
+            name = self.arrays.get(id(obj))
+            if name is None:
+                name = f"{len(self.arrays)}.npy"
+                np.save(self.array_dir / name, obj)
+                self.arrays[id(obj)] = name
+            return ("npy", name)
+        return None
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file, array_dir: Path, mmap_mode: str = "c"):
+        super().__init__(file)
+        self.array_dir = array_dir
+        self.mmap_mode = mmap_mode
+        self.arrays = {}
+
+    def persistent_load(self, pid):
+        if pid[0] == "skip":
+            return None
+        elif pid[0] == "npy":
+            name = pid[1]
+            if name not in self.arrays:
+                self.arrays[name] = np.load(self.array_dir / name, mmap_mode=self.mmap_mode)
+            return self.arrays[name]
+        raise pickle.UnpicklingError(f"Unknown persistent id {pid}.")
+
+
+def save_snapshot(sim, path, cfg_filepath=None):
+    """
+    Save the graph, node configs and resolved node data of a simulation to a directory.
+
+    Module data (ie. flopy packages) and the data of nodes downstream of modules are not saved,
+    they are marked dirty when the snapshot is loaded and rebuilt by `build(mode='dirty')`.
+    :param path: Snapshot directory (replaced if it exists).
+    :param cfg_filepath: Config file the simulation was created from (default: `sim.cfg_filepath`).
+        Its hash is stored so stale snapshots can be detected.
+    """
+    path = Path(path)
+    cfg_filepath = cfg_filepath or sim.cfg_filepath
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    if tmp_path.exists():
+        shutil.rmtree(tmp_path)
+    array_dir = tmp_path / "arrays"
+    array_dir.mkdir(parents=True)
+
+    graph = sim.graph._graph
+    modules = sim.graph.list_type("module")
+    rebuilt = set(modules).union(*(nx.descendants(graph, m) for m in modules))
+    skip = {
+        id(sim.nodes[n_id]._data) for n_id in rebuilt
+        if not isinstance(sim.nodes[n_id]._data, _PRIMITIVES)
+    }
+
+    state = {
+        "name": sim.name,
+        "cfg": sim.cfg,
+        "sim_type": sim.sim_type,
+        "ref_dir": sim.ref_dir,
+        "derived_dir": sim.derived_dir,
+        "template": sim.template,
+        "graph": sim.graph,
+        "name_registry": sim.name_registry,
+        "rebuilt": sorted(rebuilt),
+        "cache": (str(sim.cache.cache_dir), sim.cache.max_size) if sim.cache is not None else None,
+        "memory_budget": sim.spill.budget if sim.spill is not None else None,
+    }
+    with open(tmp_path / "graph.pkl", "wb") as f:
+        pickler = _SnapshotPickler(f, array_dir, skip)
+        pickler.dump(state)
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "name": sim.name,
+        "sim_type": sim.sim_type,
+        "created": time.time(),
+        "config": str(cfg_filepath) if cfg_filepath else None,
+        "config_hash": config_hash(cfg_filepath) if cfg_filepath else None,
+        "nodes": len(sim.nodes),
+        "arrays": len(pickler.arrays),
+    }
+    with open(tmp_path / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    if path.exists():
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+    logging.debug(f"Snapshot of {sim.name} saved to {path} ({len(pickler.arrays)} arrays).")
+    return manifest
+
+
+def load_snapshot(path, cfg_filepath=None, mmap_mode: str = "c"):
+    """
+    Load a simulation saved with `save_snapshot`. Call `build(mode='dirty')` to rebuild the modules.
+    :param cfg_filepath: If given, the snapshot must have been saved from this config file (unchanged).
+    :param mmap_mode: How arrays are memory-mapped ('c' copy-on-write, 'r' read-only, None to load in memory).
+    """
+    from rapid_gwm_build.simulation import Simulation
+
+    path = Path(path)
+    manifest = read_manifest(path)
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Snapshot {path} has version {manifest.get('version')}, expected {SNAPSHOT_VERSION}.")
+    if cfg_filepath is not None and manifest.get("config_hash") != config_hash(cfg_filepath):
+        raise ValueError(f"Snapshot {path} is out of date: {cfg_filepath} has changed since it was saved.")
+
+    with open(path / "graph.pkl", "rb") as f:
+        state = _SnapshotUnpickler(f, path / "arrays", mmap_mode=mmap_mode).load()
+
+    sim = Simulation.__new__(Simulation)
+    sim.name = state["name"]
+    sim.cfg = state["cfg"]
+    sim.cfg_filepath = cfg_filepath or manifest.get("config")
+    sim.sim_type = state["sim_type"]
+    sim.ref_dir = state["ref_dir"]
+    sim.derived_dir = state["derived_dir"]
+    sim.template = state["template"]
+    sim.graph = state["graph"]
+    sim.edges = sim.graph._graph.edges
+    sim.name_registry = state["name_registry"]
+    sim.cache = NodeCache(*state["cache"]) if state["cache"] is not None else None
+    sim.trace = BuildTrace()
+    sim.timings = {}
+    budget = state["memory_budget"]
+    sim.spill = SpillManager(sim.derived_dir / 'spill', budget=budget) if budget is not None else None
+
+    for n_id in state["rebuilt"]:
+        node = sim.nodes[n_id]
+        node._data = None
+        node.invalidate()
+    logging.debug(f"Snapshot of {sim.name} loaded from {path}, {len(state['rebuilt'])} nodes to rebuild.")
+    return sim
@@ -1,12 +1,25 @@
 from rapid_gwm_build.parsers.yaml_processor import template_processor
 
+import hashlib
 import logging
+import os
+import pickle
+from pathlib import Path
+
+from rapid_gwm_build.cache import default_cache_dir, hash_file, stable_repr
+from rapid_gwm_build.templates.template_schema import SCHEMA_VERSION, top_level_schema
+
+TEMPLATE_DIR = Path(__file__).parent
+COMPILED_VERSION = 1  # bump when the template nodes change (invalidates compiled templates)
 
 templates = {
-    'mf6': r'src\rapid_gwm_build\templates\mf6_template.yaml',
+    'mf6': TEMPLATE_DIR / 'mf6_template.yaml',
 }
 
 class TemplateLoader:
+    disk_cache = True  # also keep compiled templates in <cache dir>/templates
+    _compiled = {}  # cache key -> pickled (template, template nodes)
+
     @staticmethod
     def load_template(sim_type):
         
@@ -20,3 +33,81 @@ class TemplateLoader:
             logging.debug("No sim template file.")
             return None
 
+    @classmethod
+    def load_compiled(cls, sim_type):
+        """
+        Returns the validated template with its build dependencies replaced by template node references,
+        and the parsed template nodes. Compiled templates are cached (in memory and on disk) on the
+        template file hash and the schema version, so validation and parsing only run once.
+        Every call returns new copies, the nodes hold the data of a single simulation.
+        :return: (template, {node_id: template node})
+        """
+        filepath = templates.get(sim_type)
+        if not filepath:
+            logging.debug("No sim template file.")
+            return None, {}
+
+        key = cls._cache_key(filepath)
+        blob = cls._compiled.get(key)
+        if blob is None:
+            blob = cls._read_compiled(key)
+            if blob is None:
+                blob = cls._compile(sim_type)
+                cls._write_compiled(key, blob)
+            cls._compiled[key] = blob
+        return pickle.loads(blob)
+
+    @staticmethod
+    def _cache_key(filepath) -> str:
+        schema_hash = hashlib.sha256(stable_repr(top_level_schema).encode()).hexdigest()
+        return hashlib.sha256(
+            f"{hash_file(filepath)}:{SCHEMA_VERSION}:{schema_hash}:{COMPILED_VERSION}".encode()
+        ).hexdigest()
+
+    @classmethod
+    def _compile(cls, sim_type) -> bytes:
+        from rapid_gwm_build.parsers.config_parser import ConfigParser
+
+        template = cls.load_template(sim_type)
+        config, template_nodes = ConfigParser.parse_template(template)
+        template.update(config)
+        return pickle.dumps((template, template_nodes), protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def _compiled_path(cls, key: str) -> Path:
+        return default_cache_dir() / "templates" / f"{key}.pkl"
+
+    @classmethod
+    def _read_compiled(cls, key: str):
+        if not cls.disk_cache:
+            return None
+        path = cls._compiled_path(key)
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+            pickle.loads(blob)  # stale pickles (ie. moved classes) are recompiled
+            return blob
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.debug(f"Compiled template {path} could not be loaded: {e}")
+            return None
+
+    @classmethod
+    def _write_compiled(cls, key: str, blob: bytes):
+        if not cls.disk_cache:
+            return
+        path = cls._compiled_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.debug(f"Compiled template could not be written to {path}: {e}")
+
+    @classmethod
+    def clear_cache(cls):
+        """Drop the in-memory compiled templates (the on-disk cache is validated on the file hash)."""
+        cls._compiled.clear()
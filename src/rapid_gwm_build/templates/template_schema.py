@@ -1,3 +1,5 @@
+SCHEMA_VERSION = 1  # bump when the schema changes (invalidates compiled templates)
+
 pipeline_schema = {
     "pipes": {
         "type": "dict",
@@ -55,6 +57,7 @@ module_schema = {
 
 top_level_schema = {
     'write': {'type': 'dict'},
+    'write_module': {'type': 'dict', 'required': False},
     "module_templates": {
         "type": "dict",
         "keysrules": {
@@ -0,0 +1,191 @@
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+
+
+_io = threading.local()
+
+
+def count_bytes_read(nbytes: int):
+    """
+    Record bytes read from input files by the current thread (called by the file inputs).
+    """
+    _io.bytes_read = getattr(_io, "bytes_read", 0) + nbytes
+
+
+def _bytes_read() -> int:
+    return getattr(_io, "bytes_read", 0)
+
+
+def data_size(data) -> int:
+    """
+    Approximate size in bytes of resolved node data.
+    """
+    if data is None:
+        return 0
+    elif hasattr(data, "nbytes") and hasattr(data, "dtype"):  # numpy arrays
+        return int(data.nbytes)
+    elif hasattr(data, "memory_usage"):  # pandas objects
+        usage = data.memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    elif isinstance(data, dict):
+        return sys.getsizeof(data) + sum(data_size(v) for v in data.values())
+    elif isinstance(data, (list, tuple)):
+        return sys.getsizeof(data) + sum(data_size(v) for v in data)
+    return sys.getsizeof(data)
+
+
+def longest_path(graph, cost: dict) -> tuple:
+    """
+    The chain of dependent nodes with the largest total cost.
+    :param graph: A DAG of node IDs.
+    :param cost: node ID -> cost (ie. seconds). Missing nodes cost 0.
+    :return: (list of node IDs, total cost)
+    """
+    import networkx as nx
+
+    dist, prev = {}, {}
+    for n_id in nx.topological_sort(graph):
+        best = max(graph.predecessors(n_id), key=lambda p: dist.get(p, 0.0), default=None)
+        dist[n_id] = cost.get(n_id, 0.0) + (dist.get(best, 0.0) if best is not None else 0.0)
+        prev[n_id] = best
+
+    if not dist:
+        return [], 0.0
+    n_id = max(dist, key=dist.get)
+    total = dist[n_id]
+    path = []
+    while n_id is not None:
+        path.append(n_id)
+        n_id = prev[n_id]
+    return path[::-1], total
+
+
+@dataclass
+class TraceEvent:
+    """Timing of a single node resolution (or another span, ie. a write call)."""
+    name: str
+    cat: str
+    start: float  # seconds since the start of the trace
+    wall: float = 0.0
+    cpu: float = 0.0
+    bytes_read: int = 0
+    output_size: int = 0
+    cached: bool = False
+    thread: int = 0
+    args: dict = field(default_factory=dict)
+
+
+class BuildTrace:
+    """
+    Records a timeline of node resolutions during `Simulation.build` and calls during `Simulation.write`.
+    """
+    def __init__(self):
+        self.events = []
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_report(cls, report: list):
+        """
+        Rebuild a trace from `report()` (ie. the trace of a build in a worker process).
+        """
+        trace = cls()
+        trace.events = [TraceEvent(**event) for event in report]
+        return trace
+
+    @contextmanager
+    def span(self, name: str, cat: str):
+        """
+        Time a block of code on the current thread. Yields the event so callers can add details.
+        """
+        event = TraceEvent(name=name, cat=cat, start=time.perf_counter() - self._t0, thread=threading.get_ident())
+        cpu0 = time.thread_time()
+        read0 = _bytes_read()
+        try:
+            yield event
+        finally:
+            event.wall = time.perf_counter() - self._t0 - event.start
+            event.cpu = time.thread_time() - cpu0
+            event.bytes_read = _bytes_read() - read0
+            with self._lock:
+                self.events.append(event)
+
+    @contextmanager
+    def measure(self, node):
+        """
+        Time the resolution of a node and record the size of its output.
+        """
+        with self.span(node.id, node.type) as event:
+            yield event
+        event.output_size = data_size(node._data)
+
+    def nodes(self) -> dict:
+        """Events of the resolved nodes by node ID."""
+        return {e.name: e for e in self.events if e.cat != "write"}
+
+    def report(self) -> list:
+        """
+        Structured report of all events, sorted by start time.
+        """
+        return [asdict(e) for e in sorted(self.events, key=lambda e: e.start)]
+
+    def summary(self) -> dict:
+        """
+        Totals per node type (ie. 'input', 'pipe', 'mesh', 'module', 'write').
+        """
+        totals = {}
+        for e in self.events:
+            t = totals.setdefault(e.cat, {"count": 0, "wall": 0.0, "cpu": 0.0, "bytes_read": 0, "output_size": 0})
+            t["count"] += 1
+            t["wall"] += e.wall
+            t["cpu"] += e.cpu
+            t["bytes_read"] += e.bytes_read
+            t["output_size"] += e.output_size
+        return totals
+
+    def critical_path(self, graph) -> tuple:
+        """
+        The chain of dependent nodes with the largest total wall time.
+        :param graph: The graph which was built (ie. `sim.graph.subgraph`).
+        :return: (list of node IDs, total wall time in seconds)
+        """
+        timings = self.nodes()
+        return longest_path(graph, {n_id: e.wall for n_id, e in timings.items()})
+
+    def to_chrome_trace(self, filepath=None) -> dict:
+        """
+        Export the trace in the Chrome trace event format (open in chrome://tracing or ui.perfetto.dev).
+        """
+        tids = {}
+        trace_events = []
+        for e in sorted(self.events, key=lambda e: e.start):
+            tid = tids.setdefault(e.thread, len(tids))
+            trace_events.append({
+                "name": e.name,
+                "cat": e.cat,
+                "ph": "X",
+                "ts": e.start * 1e6,
+                "dur": e.wall * 1e6,
+                "pid": 0,
+                "tid": tid,
+                "args": {
+                    "cpu_ms": e.cpu * 1e3,
+                    "bytes_read": e.bytes_read,
+                    "output_size": e.output_size,
+                    "cached": e.cached,
+                    **e.args,
+                },
+            })
+        trace = {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+        if filepath is not None:
+            with open(filepath, "w") as f:
+                json.dump(trace, f)
+        return trace
+
+    def __repr__(self):
+        return f"BuildTrace({len(self.events)} events)"
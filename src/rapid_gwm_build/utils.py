@@ -1,5 +1,11 @@
+import functools
+import logging
 
+# dotted paths of the module functions (ie. flopy classes) are imported and inspected once per
+# process: building a model resolves the same few classes for every module node
 
+
+@functools.lru_cache(maxsize=None)
 def get_function(func_path: str):
     import importlib
 
@@ -14,20 +20,20 @@ def get_function(func_path: str):
 
     return func
 
-def inspect_class_defaults(cls_path: str, ignore=["self", "args", "kwargs"]) -> dict:
-    import importlib
+
+@functools.lru_cache(maxsize=None)
+def _init_parameters(cls_path: str) -> tuple:
+    """
+    Returns the (name, default) pairs of the __init__ parameters of a class (cached).
+    """
     import inspect
 
-    try:
-        # Try to import the class from the specified path
-        module_name, class_name = cls_path.rsplit(".", 1)
-        module = importlib.import_module(module_name)
-        inspect_class = getattr(module, class_name)
-    except ImportError as e:
-        # Handle the case where the import fails
-        raise ImportError(f"Could not import {cls_path}: {e}")
+    signature = inspect.signature(get_function(cls_path).__init__)
+    return tuple((name, param.default) for name, param in signature.parameters.items())
+
 
-    signature = inspect.signature(inspect_class.__init__)
+def inspect_class_defaults(cls_path: str, ignore=["self", "args", "kwargs"]) -> dict:
+    import inspect
 
     cmd_kwargs = {
         "defaults": {},  # default values for the parameters
@@ -35,46 +41,52 @@ def inspect_class_defaults(cls_path: str, ignore=["self", "args", "kwargs"]) ->
     }
 
     # Loop through the parameters and get the defaults and required ones
-    for name, param in signature.parameters.items():
+    for name, default in _init_parameters(cls_path):
         if name not in ignore:
-            cmd_kwargs["defaults"][name] = (
-                param.default
-            )  # can also checkout param.annotation or param.kind
+            cmd_kwargs["defaults"][name] = default
             # if empty then it is a required parameter
-            if param.default == inspect.Parameter.empty:
+            if default is inspect.Parameter.empty:
                 cmd_kwargs["required"].append(name)
 
     return cmd_kwargs
 
 
 def get_default_args(cls_path: str, ignore=["self", "args", "kwargs"]) -> dict:
-    import importlib
     import inspect
 
     args = {}
-    
-    try:
-        # Try to import the class from the specified path
-        module_name, class_name = cls_path.rsplit(".", 1)
-        module = importlib.import_module(module_name)
-        inspect_class = getattr(module, class_name)
-    except ImportError as e:
-        # Handle the case where the import fails
-        raise ImportError(f"Could not import {cls_path}: {e}")
-
-    signature = inspect.signature(inspect_class.__init__)
-
-    # Loop through the parameters and get the defaults and required ones
-    for name, param in signature.parameters.items():
+    for name, default in _init_parameters(cls_path):
         if name not in ignore:
-            args[name] = param.default  # can also checkout param.annotation or param.kind
             # if empty then it is a required parameter
-            if param.default == inspect.Parameter.empty:
-                args[name] = None
+            args[name] = None if default is inspect.Parameter.empty else default
 
     return args
 
 
+def prewarm_template(template: dict) -> int:
+    """
+    Import and inspect the module functions of a template up front (ie. before forking worker
+    processes, which then inherit the cache). Returns the number of functions resolved.
+    """
+    count = 0
+    for module_cfg in (template or {}).get("module_templates", {}).values():
+        func_path = module_cfg.get("func") if isinstance(module_cfg, dict) else None
+        if not isinstance(func_path, str) or "." not in func_path:
+            continue
+        try:
+            _init_parameters(func_path)
+            count += 1
+        except Exception as e:
+            # reported when (if) a module node uses the function
+            logging.debug(f"Could not prewarm {func_path}: {e}")
+    return count
+
+
+def clear_introspection_cache():
+    get_function.cache_clear()
+    _init_parameters.cache_clear()
+
+
 def set_up_ws(ws_cfg: dict, name: str) -> str:
     import os
     import shutil
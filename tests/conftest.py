@@ -0,0 +1,24 @@
+import shutil
+from pathlib import Path
+
+import pytest
+import yaml
+
+EXAMPLE_DIR = Path(__file__).parents[1] / "examples" / "simple_freyburg"
+
+
+@pytest.fixture
+def config_filepath(tmp_path, monkeypatch):
+    # the simple freyburg example, with its workspace in tmp_path
+    monkeypatch.setenv("RAPID_GWM_BUILD_CACHE", str(tmp_path / "cache"))
+    ws = tmp_path / "simple_freyburg"
+    shutil.copytree(EXAMPLE_DIR / "data", ws / "data")
+    with open(EXAMPLE_DIR / "freyburg_1lyr_stress.yaml") as f:
+        config = yaml.safe_load(f)
+    config["vars"]["ws"] = str(ws)
+    ghb = config["simulations"]["freyburg_simple"]["modules"]["ghb"]["src"]["stress_period_data"]
+    ghb["pipeline"]["input"] = "${vars.ws}/data/ghb.csv"
+    filepath = tmp_path / "freyburg.yaml"
+    with open(filepath, "w") as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+    return filepath
@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+import pytest
+
+from rapid_gwm_build.io.filepath import array_reader
+from rapid_gwm_build.io.filepath.array_reader import ArrayReader, parse_array
+
+
+def test_parse_array(tmp_path):
+    path = tmp_path / "a.arr"
+    path.write_text("# header\n  1  2  3\n  4  5  6 # comment\n\n")
+    np.testing.assert_array_equal(parse_array(path), [[1, 2, 3], [4, 5, 6]])
+
+    path.write_text("1 2 3\n")
+    assert parse_array(path).shape == (3,)  # as np.loadtxt
+
+
+@pytest.mark.parametrize("text", ["1 2 3\n4 5\n", "1 2\nx 4\n"])
+def test_parse_array_errors(tmp_path, text):
+    path = tmp_path / "a.arr"
+    path.write_text(text)
+    with pytest.raises(ValueError, match="a.arr"):
+        parse_array(path)
+
+
+@pytest.fixture
+def parses(tmp_path, monkeypatch):
+    # sidecars for every array, counting the text parses
+    monkeypatch.setattr(ArrayReader, "sidecar_dir", tmp_path / "arrays")
+    monkeypatch.setattr(ArrayReader, "min_sidecar_size", 0)
+    calls = []
+    parse = array_reader.parse_array
+    monkeypatch.setattr(array_reader, "parse_array", lambda *args, **kwargs: calls.append(1) or parse(*args, **kwargs))
+    return calls
+
+
+def test_sidecar_reuse(tmp_path, parses):
+    path = tmp_path / "a.arr"
+    path.write_text("1 2\n3 4\n")
+    first = ArrayReader.read(str(path))
+    second = ArrayReader.read(str(path))
+    assert isinstance(second, np.memmap)
+    np.testing.assert_array_equal(first, second)
+    assert len(parses) == 1
+
+    # touched but unchanged: validated on the hash
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    ArrayReader.read(str(path))
+    assert len(parses) == 1
+
+
+def test_sidecar_invalidated(tmp_path, parses):
+    path = tmp_path / "a.arr"
+    path.write_text("1 2\n3 4\n")
+    ArrayReader.read(str(path))
+
+    stat = os.stat(path)
+    path.write_text("5 6\n7 8\n")  # same size
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    np.testing.assert_array_equal(ArrayReader.read(str(path)), [[5, 6], [7, 8]])
+    assert len(parses) == 2
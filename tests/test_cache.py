@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+
+from rapid_gwm_build import create_simulation
+from rapid_gwm_build.nodes.node_types import _output_files
+
+GHB_PIPE = "pipe.ghb.stress_period_data.to_mf6_txt"
+
+
+def test_cache_hit_recreates_missing_files(config_filepath, tmp_path):
+    cache_dir = tmp_path / "nodes"
+    sim = create_simulation(config_filepath, cache_dir=cache_dir)
+    sim.build()
+    files = _output_files(sim.nodes[GHB_PIPE].data)
+    assert files
+    for path in files:
+        os.remove(path)
+
+    sim = create_simulation(config_filepath, cache_dir=cache_dir)
+    sim.build()
+    assert sim.cache.stats()["hits"] > 0
+    assert all(os.path.exists(path) for path in files)
+
+
+def _edit_active_domain(config_filepath):
+    path = config_filepath.parent / "simple_freyburg" / "data" / "input" / "freyberg6.dis_idomain_layer1.arr"
+    data = np.loadtxt(path)
+    data[0, 0] = 0
+    np.savetxt(path, data, fmt="%d")
+
+
+def test_cache_hit_and_miss(config_filepath, tmp_path):
+    cache_dir = tmp_path / "nodes"
+    sim = create_simulation(config_filepath, cache_dir=cache_dir)
+    sim.build()
+    assert sim.cache.stats()["hits"] == 0
+    assert sim.cache.stats()["misses"] > 0
+
+    cached = create_simulation(config_filepath, cache_dir=cache_dir)
+    cached.build()
+    assert cached.cache.stats()["misses"] == 0
+    assert cached.cache.stats()["hits"] == sim.cache.stats()["misses"]
+    np.testing.assert_array_equal(cached.nodes["mesh"].data.top, sim.nodes["mesh"].data.top)
+    assert cached.nodes["module.gwf"].data.package_names == sim.nodes["module.gwf"].data.package_names
+
+
+def test_cache_invalidated_by_file_edit(config_filepath, tmp_path):
+    cache_dir = tmp_path / "nodes"
+    create_simulation(config_filepath, cache_dir=cache_dir).build()
+    _edit_active_domain(config_filepath)
+
+    sim = create_simulation(config_filepath, cache_dir=cache_dir)
+    sim.build()
+    assert sim.cache.stats()["misses"] > 0
+    assert sim.nodes["mesh"].data.active_domain[0, 0] == 0
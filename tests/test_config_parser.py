@@ -0,0 +1,26 @@
+import yaml
+
+from rapid_gwm_build.parsers.config_parser import ConfigParser
+
+
+def test_parse_cache_invalidated_by_created_file(config_filepath, monkeypatch):
+    # inputs are only files if they exist when the config is parsed
+    with open(config_filepath) as f:
+        config = yaml.safe_load(f)
+    config["simulations"]["freyburg_simple"]["modules"]["npf"]["k"] = "${vars.ws}/data/k.arr"
+    with open(config_filepath, "w") as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+
+    calls = []
+    parse_substituted = ConfigParser._parse_substituted.__func__
+    monkeypatch.setattr(ConfigParser, "_parse_substituted", classmethod(
+        lambda cls, config: calls.append(1) or parse_substituted(cls, config)))
+
+    ConfigParser.parse(config_filepath)
+    ConfigParser.parse(config_filepath)
+    assert len(calls) == 1
+
+    with open(config_filepath.parent / "simple_freyburg" / "data" / "k.arr", "w") as f:
+        f.write("1.0\n")
+    ConfigParser.parse(config_filepath)
+    assert len(calls) == 2
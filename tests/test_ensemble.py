@@ -0,0 +1,63 @@
+import os
+
+from rapid_gwm_build.ensemble import Ensemble
+from rapid_gwm_build.io.object_store import LINKS_MARKER, ObjectStore
+
+OUTPUTS = ["mfsim.lst", "freyburg6.lst", "freyberg6_freyberg.hds", "freyberg6_freyberg.cbc"]
+
+
+def _run(ws, content):
+    # MF6 opens its outputs with REPLACE (truncated in place)
+    for output in OUTPUTS:
+        with open(ws / output, "w") as f:
+            f.write(content)
+
+
+def test_realizations_do_not_share_outputs(config_filepath):
+    ens = Ensemble(config_filepath, dedup=True)
+    ens.build_base()
+    _run(ens.base_ws, "base")
+    ens.base.write(dedup=ens.store)  # rewrite the base after a run
+    ens.run({"a": {"modules.ic.strt": 30.0}, "b": {"modules.ic.strt": 31.0}})
+
+    ws_a, ws_b = ens.realization_ws("a"), ens.realization_ws("b")
+    for output in OUTPUTS:
+        assert output not in ens.base.written_files
+        assert not (ws_a / output).exists()  # no stale base results in the realizations
+        assert os.stat(ens.base_ws / output).st_nlink == 1
+
+    _run(ws_a, "a")
+    for output in OUTPUTS:
+        assert (ens.base_ws / output).read_text() == "base"
+        assert not (ws_b / output).exists()
+
+    # the unchanged input files are still shared
+    assert os.path.samefile(ws_a / "freyburg6.dis", ws_b / "freyburg6.dis")
+
+
+def test_realizations_copy_input_files_only(config_filepath):
+    ens = Ensemble(config_filepath)
+    ens.build_base()
+    _run(ens.base_ws, "base")
+    ens.run({"a": {"modules.ic.strt": 30.0}})
+
+    ws_a = ens.realization_ws("a")
+    for output in OUTPUTS:
+        assert not (ws_a / output).exists()  # no stale base results in the realization
+    files = [str(p.relative_to(ws_a)) for p in ws_a.rglob("*") if p.is_file()]
+    assert sorted(files) == sorted(ens.base.written_files)
+    assert (ws_a / "freyburg6.dis").read_text() == (ens.base_ws / "freyburg6.dis").read_text()
+
+
+def test_linked_files_are_read_only(config_filepath):
+    ens = Ensemble(config_filepath, dedup=True)
+    ens.build_base()
+    dis = ens.base_ws / "freyburg6.dis"
+    assert os.stat(dis).st_nlink > 1
+    assert not os.stat(dis).st_mode & 0o222
+    assert ObjectStore.has_links(ens.base_ws)
+
+    ens.base.write()  # without dedup, the linked files are detached first
+    assert os.stat(dis).st_nlink == 1
+    assert not ObjectStore.has_links(ens.base_ws)
+    assert LINKS_MARKER not in ens.base.written_files
@@ -0,0 +1,20 @@
+import pytest
+
+from rapid_gwm_build.parsers.interpolation import Interpolator, interpolate
+
+
+def test_nested_references():
+    config = {"vars": {"ws": "/models", "data": "${vars.ws}/data"}, "input": "${vars.data}/top.arr"}
+    assert interpolate(config)["input"] == "/models/data/top.arr"
+
+
+def test_circular_reference():
+    config = {"a": "${b}", "b": "x${c}", "c": "${a}"}
+    with pytest.raises(ValueError, match="b -> c -> a -> b"):
+        interpolate(config)
+
+
+def test_missing_key():
+    with pytest.raises(KeyError, match="vars.missing"):
+        interpolate({"input": "${vars.missing}/top.arr"})
+    assert Interpolator({}, strict=False).interpolate("${vars.missing}") == "${vars.missing}"
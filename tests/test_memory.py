@@ -0,0 +1,34 @@
+import numpy as np
+
+from rapid_gwm_build import create_simulation
+from rapid_gwm_build.memory import SpillManager
+
+
+def _arrays(sim):
+    return {
+        n_id: node._data for n_id, node in sim.nodes.items()
+        if isinstance(node._data, np.ndarray) and not node._data.dtype.hasobject
+    }
+
+
+def test_shared_arrays_count_once(config_filepath):
+    sim = create_simulation(config_filepath, memory_budget=10**9)
+    sim.build(release_data=False)
+
+    arrays = _arrays(sim)
+    bases = {id(SpillManager._base(arr)): SpillManager._base(arr).nbytes for arr in arrays.values()}
+    assert len(bases) < len(arrays)  # ie. a pipeline and its last pipe
+    assert sim.spill.resident == sum(bases.values())
+
+
+def test_spill_repoints_aliases(config_filepath):
+    sim = create_simulation(config_filepath, memory_budget=0)
+    sim.spill.min_size = 0
+    sim.build(release_data=False)
+
+    arrays = _arrays(sim)
+    assert all(isinstance(arr, np.memmap) for arr in arrays.values())
+    assert sim.nodes["pipeline.dis.delr.template"].data is sim.nodes["mesh.delr"].data
+    # the mesh lets go of its array as well
+    assert sim.nodes["mesh"].data.delr is sim.nodes["mesh.delr"].data
+    assert sim.spill.resident == 0
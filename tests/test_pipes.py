@@ -0,0 +1,29 @@
+import yaml
+
+from rapid_gwm_build import create_simulation
+from rapid_gwm_build.pipes.pipe_registry import pipe_registry
+
+PLUGIN = '''
+def keep_rows(data, nrows):
+    return data.head(nrows)
+'''
+
+
+def test_manifest_plugin_without_kwargs(config_filepath, tmp_path, monkeypatch):
+    (tmp_path / "my_pipes.py").write_text(PLUGIN)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for attr in ("_registry", "_manifest", "_signatures"):
+        monkeypatch.setattr(pipe_registry, attr, dict(getattr(pipe_registry, attr)))
+    pipe_registry.register_manifest({"keep_rows": "my_pipes:keep_rows"})
+
+    # a step with config keys the plugin does not take
+    with open(config_filepath) as f:
+        config = yaml.safe_load(f)
+    ghb = config["simulations"]["freyburg_simple"]["modules"]["ghb"]["src"]["stress_period_data"]
+    ghb["pipeline"]["pipes"].insert(0, {"processor": "keep_rows", "nrows": 3, "type": "table"})
+    with open(config_filepath, "w") as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+
+    sim = create_simulation(config_filepath)
+    sim.build()
+    assert len(sim.nodes["pipe.ghb.stress_period_data.keep_rows"].data) == 3
@@ -0,0 +1,33 @@
+import numpy as np
+
+from rapid_gwm_build.io.read_cache import ReadCache
+
+
+def _files(tmp_path, n):
+    paths = []
+    for i in range(n):
+        path = tmp_path / f"{i}.txt"
+        path.write_text(str(i))
+        paths.append(path)
+    return paths
+
+
+def test_shared_arrays_are_read_only(tmp_path):
+    cache = ReadCache()
+    path, = _files(tmp_path, 1)
+    data = cache.open(path, {}, lambda: np.zeros(3))
+    assert cache.open(path, {}, lambda: np.ones(3)) is data
+    assert not data.flags.writeable
+    assert not cache._key_locks
+
+    cache.enabled = False
+    assert cache.open(path, {}, lambda: np.zeros(3)).flags.writeable
+
+
+def test_strong_references_are_bounded(tmp_path):
+    cache = ReadCache(max_strong=2)
+    paths = _files(tmp_path, 3)
+    for path in paths:
+        cache.open(path, {}, lambda: {"parsed": "yaml"})
+    assert len(cache) == 2
+    assert list(cache._strong) == [cache.key(p, {}) for p in paths[1:]]
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from rapid_gwm_build import create_simulation
+
+ACTIVE_DOMAIN = "freyberg6.dis_idomain_layer1.arr"
+
+
+def _edit_active_domain(config_filepath):
+    path = config_filepath.parent / "simple_freyburg" / "data" / "input" / ACTIVE_DOMAIN
+    data = np.loadtxt(path)
+    data[0, 0] = 0
+    np.savetxt(path, data, fmt="%d")
+
+
+@pytest.mark.parametrize("from_cache", [False, True])
+def test_rebuild_after_file_edit(config_filepath, tmp_path, from_cache):
+    cache_dir = tmp_path / "nodes"
+    if from_cache:
+        create_simulation(config_filepath, cache_dir=cache_dir).build()
+    sim = create_simulation(config_filepath, cache_dir=cache_dir)
+    sim.build()
+    if from_cache:
+        assert sim.cache.stats()["hits"] > 0
+    assert sim.nodes["mesh"].data.active_domain[0, 0] == 1
+
+    _edit_active_domain(config_filepath)
+    assert [n_id for n_id in sim.graph.list_type("input") if sim.nodes[n_id].is_modified()] == ["input.mesh.active_domain"]
+    sim.rebuild()
+    assert sim.nodes["mesh"].data.active_domain[0, 0] == 0
+    assert not sim.nodes["input.mesh.active_domain"].is_modified()
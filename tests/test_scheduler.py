@@ -0,0 +1,55 @@
+import random
+import time
+
+import networkx as nx
+import pytest
+
+from rapid_gwm_build import create_simulation
+from rapid_gwm_build.scheduler import BuildScheduler, NodeBuildError
+
+
+def _graph():
+    # independent chains, the last node of each chain is not parallel safe
+    graph = nx.DiGraph()
+    for chain in range(6):
+        graph.add_edge(f"input.{chain}", f"pipe.{chain}")
+        graph.add_edge(f"pipe.{chain}", f"module.{chain}")
+    return graph
+
+
+def test_serial_nodes_run_in_order():
+    graph = _graph()
+    order = list(nx.topological_sort(graph))
+    for _ in range(5):
+        ran = []
+
+        def func(n_id):
+            time.sleep(random.random() / 100)
+            if n_id.startswith("module."):
+                ran.append(n_id)
+
+        BuildScheduler(graph, max_workers=8).run(order, func, parallel_safe=lambda n_id: not n_id.startswith("module."))
+        assert ran == [n_id for n_id in order if n_id.startswith("module.")]
+
+
+def test_errors_name_the_node():
+    graph = _graph()
+
+    def func(n_id):
+        if n_id == "pipe.3":
+            raise ValueError("bad data")
+
+    with pytest.raises(NodeBuildError, match="pipe.3"):
+        BuildScheduler(graph, max_workers=4).run(list(nx.topological_sort(graph)), func)
+
+
+def _package_names(config_filepath, max_workers):
+    sim = create_simulation(config_filepath)
+    sim.build(max_workers=max_workers)
+    return sim.nodes["module.gwf"].data.package_names
+
+
+def test_parallel_build_package_order(config_filepath):
+    serial = _package_names(config_filepath, None)
+    for _ in range(4):
+        assert _package_names(config_filepath, 8) == serial
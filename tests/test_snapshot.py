@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from rapid_gwm_build import create_simulation
+from rapid_gwm_build.simulation import Simulation
+
+
+def test_snapshot_round_trip(config_filepath, tmp_path):
+    sim = create_simulation(config_filepath)
+    sim.build()
+    sim.save_snapshot(tmp_path / "snapshot")
+
+    loaded = Simulation.load_snapshot(tmp_path / "snapshot", cfg_filepath=config_filepath)
+    np.testing.assert_array_equal(loaded.nodes["mesh"].data.top, sim.nodes["mesh"].data.top)
+    assert loaded.nodes["module.gwf"].dirty
+
+    loaded.build(mode="dirty")
+    assert not loaded.nodes["module.gwf"].dirty
+    assert loaded.nodes["module.gwf"].data.package_names == sim.nodes["module.gwf"].data.package_names
+
+
+def test_snapshot_of_changed_config(config_filepath, tmp_path):
+    sim = create_simulation(config_filepath)
+    sim.build()
+    sim.save_snapshot(tmp_path / "snapshot")
+
+    config_filepath.write_text(config_filepath.read_text() + "\n# edited\n")
+    with pytest.raises(ValueError, match="out of date"):
+        Simulation.load_snapshot(tmp_path / "snapshot", cfg_filepath=config_filepath)